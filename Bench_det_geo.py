@@ -0,0 +1,179 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import tracemalloc
+import numpy as np
+import matplotlib
+# benchmarks run headless
+matplotlib.use('Agg')
+from matplotlib import pyplot as plt
+import Plot_det_geo as pdg
+
+##################################################
+# Benchmarks for geo_cone, draw_contours and     #
+#  update_plot across the built-in detectors     #
+##################################################
+# run it:
+#  python Bench_det_geo.py [-o results.json] [--baseline baseline.json]
+# - results are written as JSON (stdout if no -o is given)
+# - with --baseline, every case is compared against the stored
+#   results and the script exits with 1 if a case got slower
+#   than the tolerance allows
+
+def get_cases(quick=False):
+    # all combinations of detectors and settings
+    cases = []
+    for _type, _specs in pdg.det_registry.items():
+        for _size in _specs['sizes']:
+            for _eng, _num, _std in itertools.product(['conic', 'grid'], [12, 24], [False, True]):
+                # the grid resolution only matters for the grid engine
+                for _res in ([250, 500] if _eng == 'grid' else [None]):
+                    cases.append({'det_type':_type, 'det_size':_size, 'engine':_eng, 'tth_num':_num, 'reso_max':_res, 'std':_std})
+    if quick:
+        # one size per detector, default settings
+        _quick = {}
+        for _c in cases:
+            if _c['tth_num'] == 24 and _c['reso_max'] in [None, 500]:
+                _quick.setdefault((_c['det_type'], _c['engine'], _c['std']), _c)
+        cases = list(_quick.values())
+    return cases
+
+def get_case_id(case):
+    return f'{case["det_type"]} {case["det_size"]} {case["engine"]} n{case["tth_num"]} r{case["reso_max"]} std{int(case["std"])}'
+
+def get_bench_calibrant():
+    # synthetic cubic standard (a = 4.1569 A, like LaB6)
+    # that keeps the benchmark independent of pyFAI
+    _hkl = np.array(list(itertools.product(range(7), repeat=3)))
+    _s = np.unique((_hkl**2).sum(axis=1))
+    return 4.1569/np.sqrt(_s[_s > 0])
+
+def setup_case(case):
+    # specs for a benchmark case
+    geo, det, plo, lmt = pdg.get_specs()
+    geo.det_type = case['det_type']
+    geo.det_size = case['det_size']
+    det = pdg.get_det_specs(geo)
+    plo.cont_engine = case['engine']
+    plo.cont_tth_num = case['tth_num']
+    if case['reso_max'] is not None:
+        plo.cont_reso_max = case['reso_max']
+    plo.cont_standard = True
+    pdg.calibrant_memo['Bench'] = get_bench_calibrant()
+    geo.std_names.append('Bench')
+    geo.std_pyFAI.append('Bench')
+    geo.std_idx = len(geo.std_pyFAI)-1 if case['std'] else 0
+    return geo, det, plo, lmt
+
+def measure(func, repeat):
+    # wall times [ms] of repeated calls and the peak memory [MB]
+    # of one extra call, tracemalloc slows down every allocation
+    # and is kept out of the timing
+    _t = []
+    for _i in range(repeat):
+        _t0 = time.perf_counter()
+        func()
+        _t.append((time.perf_counter() - _t0)*1e3)
+    tracemalloc.start()
+    func()
+    _peak = tracemalloc.get_traced_memory()[1]/2**20
+    tracemalloc.stop()
+    return np.array(_t), _peak
+
+def get_stats(times, peak):
+    return {'wall_ms':float(np.median(times)), 'p50_ms':float(np.percentile(times, 50)),
+            'p90_ms':float(np.percentile(times, 90)), 'p99_ms':float(np.percentile(times, 99)),
+            'max_ms':float(np.max(times)), 'peak_mb':float(peak), 'n':len(times)}
+
+def bench_case(case, repeat, frames):
+    res = {'case':get_case_id(case)}
+    res.update(case)
+    geo, det, plo, lmt = setup_case(case)
+    # geo_cone on a single grid of the maximum resolution
+    # and batched over all contour levels (grid engine only)
+    if case['engine'] == 'grid':
+        _x = np.linspace(-100, 100, plo.cont_reso_max)
+        X0, Y0 = np.meshgrid(_x, _x)
+        Z0 = np.hypot(X0, Y0)
+        _rat = 1/np.tan(np.deg2rad(np.linspace(plo.cont_tth_min, plo.cont_tth_max, plo.cont_tth_num)))
+        # the cone heights are prepared outside of the timing
+        Z1 = Z0*_rat[0]
+        Zn = Z0*_rat[:,None,None]
+        res['geo_cone'] = get_stats(*measure(lambda: pdg.geo_cone(X0, Y0, Z1, geo.rota, geo.tilt, geo.yoff, geo.dist), repeat))
+        res['geo_cone_batch'] = get_stats(*measure(lambda: pdg.geo_cone_batch(X0, Y0, Zn, geo.rota, geo.tilt, geo.yoff, geo.dist), repeat))
+    # the full draw_contours without the contour cache
+    plo.interactive = False
+    fig, ax, widgets = pdg.make_plot(geo, det, plo, lmt)
+    plo.cont_cache = None
+    res['draw_contours'] = get_stats(*measure(lambda: pdg.draw_contours(ax, geo, plo), repeat))
+    plt.close(fig)
+    # a slider sequence through update_plot, back and forth
+    # over the rotation, including the canvas updates
+    # - without the contour cache, the way back would
+    #   only be drawn and not calculated
+    geo, det, plo, lmt = setup_case(case)
+    plo.interactive = True
+    plo.cont_cache_mb = 0
+    fig, ax, widgets = pdg.make_plot(geo, det, plo, lmt)
+    fig.canvas.draw()
+    _vals = np.concatenate((np.arange(frames//2), np.arange(frames//2)[::-1])) * lmt.rota_stp + lmt.rota_min
+    _vals = itertools.cycle(_vals)
+    res['update_plot'] = get_stats(*measure(lambda: pdg.update_plot('rota', next(_vals), fig, geo, plo, ax), 2*(frames//2)))
+    plt.close(fig)
+    return res
+
+def compare(results, baseline, tolerance):
+    # cases that got slower than (1 + tolerance) * baseline
+    _base = {_r['case']:_r for _r in baseline['results']}
+    regressions = []
+    for _r in results['results']:
+        if _r['case'] not in _base:
+            continue
+        for _stage in ['geo_cone', 'geo_cone_batch', 'draw_contours', 'update_plot']:
+            if _stage not in _r or _stage not in _base[_r['case']]:
+                continue
+            for _m in ['wall_ms', 'p90_ms']:
+                _old, _new = _base[_r['case']][_stage][_m], _r[_stage][_m]
+                if _new > (1 + tolerance) * _old:
+                    regressions.append({'case':_r['case'], 'stage':_stage, 'metric':_m, 'baseline':_old, 'result':_new, 'ratio':_new/_old})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the contour generation of Plot_det_geo.py')
+    parser.add_argument('-o', '--output', help='write the results to this .json file')
+    parser.add_argument('--baseline', help='compare against the results in this .json file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against the baseline (default: 0.25)')
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions of geo_cone and draw_contours (default: 5)')
+    parser.add_argument('--frames', type=int, default=40, help='slider steps for update_plot (default: 40)')
+    parser.add_argument('--quick', action='store_true', help='only one size per detector and default settings')
+    parser.add_argument('--filter', default='', help='only run cases containing this text, e.g. "Eiger 16M"')
+    args = parser.parse_args()
+
+    results = {'meta':{'python':platform.python_version(), 'numpy':np.__version__, 'matplotlib':matplotlib.__version__,
+                       'machine':platform.machine(), 'system':platform.system(), 'date':time.strftime('%Y-%m-%d %H:%M:%S')},
+               'results':[]}
+    cases = [_c for _c in get_cases(args.quick) if args.filter in get_case_id(_c)]
+    for _i, _c in enumerate(cases):
+        print(f'{_i+1}/{len(cases)}: {get_case_id(_c)}', file=sys.stderr)
+        results['results'].append(bench_case(_c, args.repeat, args.frames))
+
+    if args.output:
+        with open(args.output, 'w') as _f:
+            json.dump(results, _f, indent=1)
+    else:
+        print(json.dumps(results, indent=1))
+
+    if args.baseline:
+        with open(args.baseline) as _f:
+            regressions = compare(results, json.load(_f), args.tolerance)
+        for _r in regressions:
+            print(f'Regression: {_r["case"]} {_r["stage"]} {_r["metric"]}: {_r["baseline"]:.2f} -> {_r["result"]:.2f} ms ({_r["ratio"]:.2f}x)', file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+        print('No regressions', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
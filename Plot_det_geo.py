@@ -1,7 +1,30 @@
+import os
+import sys
+import json
+import copy
+import queue
+import hashlib
+import shutil
+import subprocess
+import time
+import importlib.metadata
+import itertools
+import threading
 import numpy as np
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from matplotlib.widgets import RadioButtons, Slider
 from matplotlib import pyplot as plt
-from matplotlib import cm, colors, patches
+from matplotlib import cm, colors, ticker
+from matplotlib.collections import PolyCollection
+from matplotlib.backend_bases import TimerBase
+from matplotlib.transforms import Bbox
+try:
+    from contourpy import contour_generator
+except ImportError:
+    # matplotlib < 3.6
+    contour_generator = None
+    from matplotlib import _contour
     
 def get_specs():
     ######################
@@ -32,72 +55,14 @@ def get_specs():
     geo.std_names = ['None', r'$LaB_6$', r'$Si$', r'$CeO_2$']
     #  - this is what pyFAI understands
     geo.std_pyFAI = ['None', 'LaB6', 'Si', 'CeO2']
+    # Custom standards from d-spacing files (e.g. pyFAI .D files)
+    # a list of ('display name', 'path/to/file.D')
+    geo.std_custom = []
 
     ###########################
     # Detector Specifications #
     ###########################
-    det = container()
-    if geo.det_type.startswith('Pilatus'):
-        ###############################
-        # Specifications for Pilatus3 #
-        ###############################
-        det.hms = 83.8    # [mm]  Module size (horizontal)
-        det.vms = 33.5    # [mm]  Module size (vertical)
-        det.pxs = 172e-3  # [mm]  Pixel size
-        det.hgp = 7       # [pix] Gap between modules (horizontal)
-        det.vgp = 17      # [pix] Gap between modules (vertical)
-        det.cbh = 0       # [mm]  Central beam hole
-        det.name = f'{geo.det_type} {geo.det_size}'
-        det.sizes = {'300K':(1,3),'1M':(2,5),'2M':(3,8),'6M':(5,12)}
-        if geo.det_size not in det.sizes.keys():
-            print('Unknown detector type/size combination!')
-            raise SystemExit
-        det.hmn, det.vmn = det.sizes[geo.det_size]
-    elif geo.det_type.startswith('Eiger'):
-        #############################
-        # Specifications for Eiger2 #
-        #############################
-        det.hms = 77.1    # [mm]  Module size (horizontal)
-        det.vms = 38.4    # [mm]  Module size (vertical)
-        det.pxs = 75e-3   # [mm]  Pixel size
-        det.hgp = 38      # [pix] Gap between modules (horizontal)
-        det.vgp = 12      # [pix] Gap between modules (vertical)
-        det.cbh = 0       # [mm]  Central beam hole
-        det.name = f'{geo.det_type} {geo.det_size}'
-        det.sizes = {'1M':(1,2),'4M':(2,4),'9M':(3,6),'16M':(4,8)}
-        if geo.det_size not in det.sizes.keys():
-            print('Unknown detector type/size combination!')
-            raise SystemExit
-        det.hmn, det.vmn = det.sizes[geo.det_size]
-    elif geo.det_type.startswith('MPCCD'):
-        #############################
-        # Specifications for MPCCD #
-        #############################
-        det.hms = 51.2    # [mm]  Module size (horizontal)
-        det.vms = 25.6    # [mm]  Module size (vertical)
-        det.pxs = 50e-3   # [mm]  Pixel size
-        det.hgp = 18      # [pix] Gap between modules (horizontal)
-        det.vgp = 27      # [pix] Gap between modules (vertical)
-        det.cbh = 3       # [mm]  Central beam hole
-        det.name = f'{geo.det_type} {geo.det_size}'
-        det.sizes = {'4M':(2,4)}
-        if geo.det_size not in det.sizes.keys():
-            print('Unknown detector type/size combination!')
-            raise SystemExit
-        det.hmn, det.vmn = det.sizes[geo.det_size]
-    else:
-        ###########################################
-        # ADD CUSTOM DETECTOR SPECIFICATIONS HERE #
-        ###########################################
-        det.hms = 100.0   # [mm]  Module size (horizontal)
-        det.vms = 140.0   # [mm]  Module size (vertical)
-        det.pxs = 10e-3   # [mm]  Pixel size
-        det.hgp = 0       # [pix] Gap between modules (horizontal)
-        det.vgp = 0       # [pix] Gap between modules (vertical)
-        det.hmn = 1       # [int] Number of modules (horizontal)
-        det.vmn = 1       # [int] Number of modules (vertical)
-        det.cbh = 0       # [mm]  Central beam hole
-        det.name = f'{geo.det_type} {geo.det_size} Octal'
+    det = get_det_specs(geo)
 
     ################
     # Plot Details #
@@ -125,14 +90,37 @@ def get_specs():
     plo.cont_norm_alpha = 0.25          # [float]  Contour alpha (original)
     plo.cont_norm_color = 'gray'        # [color]  Contour color (original)
     # - general section - 
-    plo.cont_reso_min = 50              # [int]    Minimum contour steps
-    plo.cont_reso_max = 500             # [int]    Maximum contour steps
+    plo.cont_engine = 'conic'           # [str]    Contour engine
+                                        #          'conic': analytic conic sections
+                                        #          'grid':  meshgrid + contour
+    plo.cont_conic_pts = 1000           # [int]    Points per conic section (conic)
+    plo.cont_tol = 0.0                  # [float]  Positional tolerance of the contours [mm] (conic)
+                                        #          refines the sampling along every contour
+                                        #          until it is met, 0: plo.cont_conic_pts points
+    plo.cont_tol_px = False             # [bool]   plo.cont_tol is given in pixels
+    plo.cont_reso_min = 50              # [int]    Minimum contour steps (grid)
+    plo.cont_reso_max = 500             # [int]    Maximum contour steps (grid)
+    plo.cont_grid_batch = 8             # [int]    Levels transformed at once (grid)
+    plo.cont_grid_dtype = 'float64'     # [str]    Grid precision float64 / float32 (grid)
+    plo.cont_cache_mb = 64              # [float]  Contour cache size [MB], 0: off
+    plo.cont_cache_prefetch = False     # [bool]   Precalculate neighbouring slider positions
+    plo.cont_coverage = False           # [bool]   Print the ring coverage on every update
+    plo.cont_cursor = True              # [bool]   Show 2-theta, d, q at the mouse position
+    plo.cont_perf_stats = False         # [bool]   Time the contour stages, see plo.cont_perf.stats()
+    plo.cont_perf_overlay = False       # [bool]   Show the frame times on the plot
+    plo.cont_perf_window = 20           # [int]    Frames in the rolling average
+    plo.cont_async = True               # [bool]   Calculate the contours in the background
+                                        #          (interactive backends only)
+    plo.cont_async_delay = 20           # [int]    Wait for the sliders to rest [ms]
+    plo.cont_async_max = 100            # [int]    Longest wait while a slider moves [ms]
     plo.module_alpha = 0.20             # [float]  Detector module alpha
     plo.module_color = 'gray'           # [color]  Detector module color
     plo.margin_top = 0.95               # [float]  Plot margin for title
     plo.plot_size = 8                   # [int]    Plot size
     plo.label_size = 9                  # [int]    Label size
     plo.plot_dpi = 300                  # [int]    Set plot DPI for saving
+    plo.movie_dpi = 100                 # [int]    Movie frame DPI, see render_movie
+    plo.movie_fps = 10                  # [int]    Movie frames per second
     plo.plot_color = 0.35               # [float]  Button color from colormap (0.0 - 1.0)
                                         # [str]    Button color e.g. '#1f77b4'
     plo.interactive = True              # [bool]   Make the plot interactive
@@ -142,6 +130,12 @@ def get_specs():
     plo.action_yoff = True              # [bool]   Show offset slider
     plo.action_tilt = True              # [bool]   Show tilt slider
     plo.action_radio = True             # [bool]   Show radio buttons
+    # - cache / pixel map section -
+    plo.cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'detector_geometry')
+                                        # [str]    Folder for cached files
+                                        #          (calibrants, pixel maps)
+    plo.pix_chunk = 256                 # [int]    Detector rows per chunk
+    plo.pix_dtype = 'float32'           # [str]    Pixel map precision float32 / float64
 
     ##########
     # Limits #
@@ -166,65 +160,82 @@ def get_specs():
     ###################################
     # !!! Don't change below here !!! #
     ###################################
+    # add the custom standards
+    for _name, _path in geo.std_custom:
+        register_calibrant(_name, _path)
+        if _name not in geo.std_pyFAI:
+            geo.std_names.append(_name)
+            geo.std_pyFAI.append(_name)
     return geo, det, plo, lmt
 
+def get_det_specs(geo):
+    ###########################
+    # Detector Specifications #
+    ###########################
+    # the built-in detectors are found in det_registry
+    # by the start of geo.det_type, e.g. 'Eiger2 CdTe' -> 'Eiger'
+    # the longest match wins, 'Eiger2 XE' is not an 'Eiger'
+    _types = [_type for _type in det_registry if geo.det_type.startswith(_type)]
+    if _types:
+        _specs = det_registry[max(_types, key=len)]
+    else:
+        ###########################################
+        # ADD CUSTOM DETECTOR SPECIFICATIONS HERE #
+        ###########################################
+        _specs = {'hms':100.0,  # [mm]  Module size (horizontal)
+                  'vms':140.0,  # [mm]  Module size (vertical)
+                  'pxs':10e-3,  # [mm]  Pixel size
+                  'hgp':0,      # [pix] Gap between modules (horizontal)
+                  'vgp':0,      # [pix] Gap between modules (vertical)
+                  'cbh':0,      # [mm]  Central beam hole
+                  # [int] Number of modules (horizontal, vertical)
+                  'sizes':{geo.det_size:(1,1)},
+                  'name':f'{geo.det_type} {geo.det_size} Octal'}
+    det = container()
+    for _k in ['hms', 'vms', 'pxs', 'hgp', 'vgp', 'cbh']:
+        setattr(det, _k, _specs[_k])
+    det.name = _specs.get('name', f'{geo.det_type} {geo.det_size}')
+    det.sizes = _specs['sizes']
+    if geo.det_size not in det.sizes.keys():
+        print('Unknown detector type/size combination!')
+        raise SystemExit
+    det.hmn, det.vmn = det.sizes[geo.det_size]
+    return det
+
+def register_detector(name, hms, vms, pxs, hgp, vgp, cbh, sizes):
+    # add a detector to det_registry, name is matched
+    # by the start of geo.det_type, see get_det_specs
+    det_registry[name] = {'hms':hms, 'vms':vms, 'pxs':pxs, 'hgp':hgp, 'vgp':vgp, 'cbh':cbh, 'sizes':dict(sizes)}
+
 def main():
     # fetch the geometry, detector, plot specifications and limits
     geo, det, plo, lmt = get_specs()
-    # translate unit for plot title
-    geo.unit_names = [r'2$\theta$', r'$d_{space}$', r'$q_{space}$', r'$sin(\theta)/\lambda$']
-    if geo.unit >= len(geo.unit_names):
-        print(f'Error: Valid geo.unit range is from 0 to {len(geo.unit_names)-1}, geo.unit={geo.unit}')
-        raise SystemExit
-    # get colormap from name
-    plo.cont_geom_cmap = cm.get_cmap(plo.cont_geom_cmap_name)
-    # figure out the color of the buttons and slider handles
-    try:
-        # try to derive color from colormap
-        plo.plot_handle_color = plo.cont_geom_cmap(plo.plot_color)
-    except TypeError:
-        # use color as defined by user
-        plo.plot_handle_color = plo.plot_color
-    # import pyFAI if standard contours are enabled
-    if plo.cont_standard:
-        from pyFAI import calibrant
-        geo.pyFAI_calibrant = calibrant
-        # get contour lines f contours are already selected (index is not 0, not None)
-        if geo.std_idx > 0:
-            # get the d spacings for the calibrtant from pyFAI
-            plo.cont_std_dsp = np.array(geo.pyFAI_calibrant.get_calibrant(geo.std_pyFAI[geo.std_idx]).get_dSpacing())
-    # set rcParams
-    plt.rcParams['savefig.dpi'] = plo.plot_dpi
-    # figure out proper plot dimensions
-    plo.xdim = (det.hms * det.hmn + det.pxs * det.hgp * det.hmn + det.cbh)/2
-    plo.ydim = (det.vms * det.vmn + det.pxs * det.vgp * det.vmn + det.cbh)/2
-    plo.fig_ratio = plo.xdim / plo.ydim
-    # scale contour grid to detector size
-    plo.cont_grid_max = int(np.ceil(max(plo.xdim, plo.ydim)))
-    # generate contour levels
-    plo.cont_levels = np.linspace(plo.cont_tth_min, plo.cont_tth_max, plo.cont_tth_num)
+    # build the figure, keep the widgets alive
+    fig, ax, widgets = make_plot(geo, det, plo, lmt)
+    # show the plot
+    plt.show()
+
+def make_plot(geo, det, plo, lmt):
+    # the plot and detector specific settings
+    init_plot(geo, plo)
+    init_panel(det, plo, lmt)
     # init the plot
     fig = plt.figure()
-    # add axes for the detector modules
-    bg = fig.add_subplot(111, aspect='equal')
-    # add axes for the contours
-    ax = fig.add_subplot(111, aspect='equal')
-    # remove both axis, ticks and labels
-    bg.set_axis_off()
-    ax.set_axis_off()
-    # limit the axis x and y
-    bg.set_xlim(-plo.xdim, plo.xdim)
-    ax.set_xlim(-plo.xdim, plo.xdim)
-    bg.set_ylim(-plo.ydim, plo.ydim)
-    ax.set_ylim(-plo.ydim, plo.ydim)
-    # setup detector and geometry
-    build_detector(bg, det, plo)
-    # create cones and draw contour lines
-    draw_contours(ax, geo, plo)
+    # the detector modules and the contours
+    bg, ax = add_panel(fig, 111, det, plo)
+    # calculate the contours in the background
+    # - the results are handed to the GUI thread by a timer,
+    #   canvases without an event loop (Agg, ...) only
+    #   have the TimerBase and are updated synchronously
+    plo.cont_worker = None
+    if plo.interactive and plo.cont_async and type(fig.canvas.new_timer()) is not TimerBase:
+        plo.cont_worker = contour_worker(fig, ax, geo, plo)
+    # the sliders and buttons need to stay referenced
+    widgets = []
     # generate some sense of interactivity
     if plo.interactive:
         # add short title to make room for the text boxes
-        plt.suptitle(f'{det.name}', size=10, fontweight='bold')
+        fig.suptitle(f'{det.name}', size=10, fontweight='bold')
         # define sliders
         if plo.action_ener:
             # make room for the sliders
@@ -234,19 +245,19 @@ def main():
             if plo.cont_standard:
                 plo.margin_right -= 0.1
             # add slider
-            sli_ener = add_slider('Energy [keV] ' , 'ener', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.ener, lmt.ener_min, lmt.ener_max, lmt.ener_stp, fig, ax, geo, plo)
+            widgets.append(add_slider('Energy [keV] ' , 'ener', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.ener, lmt.ener_min, lmt.ener_max, lmt.ener_stp, fig, ax, geo, plo))
         if plo.action_dist:
             plo.margin_top -= 0.02
-            sli_dist = add_slider('Distance [mm] ', 'dist', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.dist, lmt.dist_min, lmt.dist_max, lmt.dist_stp, fig, ax, geo, plo)
+            widgets.append(add_slider('Distance [mm] ', 'dist', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.dist, lmt.dist_min, lmt.dist_max, lmt.dist_stp, fig, ax, geo, plo))
         if plo.action_yoff:
             plo.margin_top -= 0.02
-            sli_yoff = add_slider('Offset [mm] '  , 'yoff', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.yoff, lmt.yoff_min, lmt.yoff_max, lmt.yoff_stp, fig, ax, geo, plo)
+            widgets.append(add_slider('Offset [mm] '  , 'yoff', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.yoff, lmt.yoff_min, lmt.yoff_max, lmt.yoff_stp, fig, ax, geo, plo))
         if plo.action_tilt:
             plo.margin_top -= 0.02
-            sli_tilt = add_slider('Tilt [˚] '     , 'tilt', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.tilt, lmt.tilt_min, lmt.tilt_max, lmt.tilt_stp, fig, ax, geo, plo)
+            widgets.append(add_slider('Tilt [˚] '     , 'tilt', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.tilt, lmt.tilt_min, lmt.tilt_max, lmt.tilt_stp, fig, ax, geo, plo))
         if plo.action_rota:
             plo.margin_top -= 0.02
-            sli_rota = add_slider('Rotation [˚] ' , 'rota', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.rota, lmt.rota_min, lmt.rota_max, lmt.rota_stp, fig, ax, geo, plo)
+            widgets.append(add_slider('Rotation [˚] ' , 'rota', 0.3, plo.margin_top, plo.margin_right, 0.025, geo.rota, lmt.rota_min, lmt.rota_max, lmt.rota_stp, fig, ax, geo, plo))
         # add radio buttons and an axis for the buttons
         if plo.action_radio:
             # figure out a proper size of the axis
@@ -254,6 +265,7 @@ def main():
             # add the axes
             axs_unit = fig.add_axes([0.0, plo.margin_top-0.01, _ds, _ds], frameon=False, aspect='equal')
             box_unit = RadioButtons(axs_unit, geo.unit_names, active=geo.unit, activecolor=plo.plot_handle_color)
+            widgets.append(box_unit)
             box_unit.on_clicked(lambda val: update_plot('unit', geo.unit_names.index(val), fig, geo, plo, ax))
             # change label size
             for l in box_unit.labels:
@@ -265,6 +277,7 @@ def main():
             # add the axes
             axs_std = fig.add_axes([0.85, plo.margin_top-0.01, _ds, _ds], frameon=False, aspect='equal')
             box_std = RadioButtons(axs_std, geo.std_names, active=geo.std_idx, activecolor=plo.plot_handle_color)
+            widgets.append(box_std)
             box_std.on_clicked(lambda val: update_plot('std', geo.std_names.index(val), fig, geo, plo, ax))
             # change label size
             for l in box_std.labels:
@@ -273,154 +286,599 @@ def main():
         # make room for the second title line
         plo.margin_top -= 0.02
         # add title / information
-        plt.suptitle(f'{det.name} | Energy: {geo.ener} keV | Distance: {geo.dist} cm\nRotation: {geo.rota}° | Tilt: {geo.tilt}° | Offset: {geo.yoff} cm | Units: {geo.unit_names[geo.unit]}', size=10)
+        fig.suptitle(get_plot_title(geo, det), size=10)
     # adjust the margins
-    plt.subplots_adjust(top=plo.margin_top, bottom=0, right=1, left=0, hspace=0, wspace=0)
+    fig.subplots_adjust(top=plo.margin_top, bottom=0, right=1, left=0, hspace=0, wspace=0)
     # adjust the figure size
     fig.set_size_inches(plo.plot_size * plo.margin_top * plo.fig_ratio, plo.plot_size)
-    # show the plot
-    plt.show()
+    # create cones and draw contour lines
+    # - the label gaps depend on the final axes size
+    if plo.cont_perf is not None:
+        plo.cont_perf.begin()
+    draw_contours(ax, geo, plo)
+    if plo.cont_perf is not None:
+        plo.cont_perf.end()
+        plo.cont_artists.set_perf(plo.cont_perf)
+    return fig, ax, widgets
+
+def get_plot_title(geo, det):
+    return f'{det.name} | Energy: {geo.ener} keV | Distance: {geo.dist} cm\nRotation: {geo.rota}° | Tilt: {geo.tilt}° | Offset: {geo.yoff} cm | Units: {geo.unit_names[geo.unit]}'
+
+def init_plot(geo, plo):
+    # settings shared by all detectors of a figure
+    # translate unit for plot title
+    geo.unit_names = [r'2$\theta$', r'$d_{space}$', r'$q_{space}$', r'$sin(\theta)/\lambda$']
+    if geo.unit >= len(geo.unit_names):
+        print(f'Error: Valid geo.unit range is from 0 to {len(geo.unit_names)-1}, geo.unit={geo.unit}')
+        raise SystemExit
+    # get colormap from name
+    plo.cont_geom_cmap = cm.get_cmap(plo.cont_geom_cmap_name)
+    # figure out the color of the buttons and slider handles
+    try:
+        # try to derive color from colormap
+        plo.plot_handle_color = plo.cont_geom_cmap(plo.plot_color)
+    except TypeError:
+        # use color as defined by user
+        plo.plot_handle_color = plo.plot_color
+    # get contour lines if contours are already selected (index is not 0, not None)
+    if plo.cont_standard and geo.std_idx > 0:
+        # get the d spacings for the calibrant (cached, pyFAI is only imported if needed)
+        plo.cont_std_dsp = get_calibrant_dsp(geo.std_pyFAI[geo.std_idx], plo)
+    # set rcParams
+    plt.rcParams['savefig.dpi'] = plo.plot_dpi
+    # generate contour levels
+    plo.cont_levels = np.linspace(plo.cont_tth_min, plo.cont_tth_max, plo.cont_tth_num)
+    # time the contour stages
+    plo.cont_perf = None
+    if plo.cont_perf_stats or plo.cont_perf_overlay:
+        plo.cont_perf = perf_stats(plo.cont_perf_window)
+
+def init_panel(det, plo, lmt):
+    # detector specific settings
+    # figure out proper plot dimensions
+    plo.xdim, plo.ydim = get_det_dims(det)
+    plo.fig_ratio = plo.xdim / plo.ydim
+    # scale contour grid to detector size
+    plo.cont_grid_max = int(np.ceil(max(plo.xdim, plo.ydim)))
+    # contour tolerance in mm
+    plo.cont_tol_mm = plo.cont_tol * (det.pxs if plo.cont_tol_px else 1.0)
+    # cache the contour lines on the slider steps
+    plo.cont_cache = None
+    if plo.cont_cache_mb > 0:
+        plo.cont_cache = contour_cache(plo.cont_cache_mb, lmt)
+
+def add_panel(fig, spec, det, plo):
+    # axes for the detector modules and the contours
+    # at spec (anything fig.add_subplot takes)
+    # add axes for the detector modules
+    bg = fig.add_subplot(spec, aspect='equal')
+    # add axes for the contours
+    ax = fig.add_subplot(spec, aspect='equal')
+    # remove both axis, ticks and labels
+    bg.set_axis_off()
+    ax.set_axis_off()
+    # limit the axis x and y
+    bg.set_xlim(-plo.xdim, plo.xdim)
+    ax.set_xlim(-plo.xdim, plo.xdim)
+    bg.set_ylim(-plo.ydim, plo.ydim)
+    ax.set_ylim(-plo.ydim, plo.ydim)
+    # setup detector and geometry
+    build_detector(bg, det, plo)
+    # the detector for the coverage report and the cursor
+    plo.cont_det = det
+    # the contour lines and labels are updated in place
+    plo.cont_artists = contour_artists(fig, ax, plo)
+    # the toolbar asks the top axes for the readout
+    bg.format_coord = ax.format_coord
+    return bg, ax
+
+def make_scene(geo, dets, plo, lmt):
+    ##################################################
+    # Several detectors in one figure, one panel per #
+    #  detector, the energy is shared by all of them #
+    ##################################################
+    # - dets: list of (det, placement), the placement holds
+    #   the dist, rota, tilt and yoff of the detector, the
+    #   values that are not given are taken from geo
+    # - the levels and calibrant rings are calculated once
+    #   per update and shared, see get_levels
+    # - returns the figure and the scene container that
+    #   is passed to update_scene
+    init_plot(geo, plo)
+    scn = container()
+    scn.geo = geo
+    scn.plo = plo
+    scn.panels = []
+    # init the plot
+    fig = plt.figure()
+    # the panel widths follow the detector dimensions
+    _dims = [get_det_dims(_det) for _det,_ in dets]
+    _grd = fig.add_gridspec(1, len(dets), width_ratios=[_x/_y for _x,_y in _dims])
+    for _i, (_det, _pla) in enumerate(dets):
+        pan = container()
+        pan.det = _det
+        # every panel has its own geometry and settings
+        pan.geo = copy.copy(geo)
+        for _n, _v in _pla.items():
+            if _n not in ['dist', 'rota', 'tilt', 'yoff']:
+                print(f'Error: Valid placement keys are dist, rota, tilt and yoff, got {_n}')
+                raise SystemExit
+            setattr(pan.geo, _n, float(_v))
+        pan.plo = copy.copy(plo)
+        init_panel(_det, pan.plo, lmt)
+        # the scene is updated synchronously
+        # and the timings are not per panel
+        pan.plo.cont_worker = None
+        pan.plo.cont_perf = None
+        pan.bg, pan.ax = add_panel(fig, _grd[0, _i], _det, pan.plo)
+        pan.title = pan.ax.set_title(get_panel_title(pan), size=plo.label_size)
+        scn.panels.append(pan)
+    # the sliders and buttons need to stay referenced
+    scn.widgets = []
+    # make room for the panel titles
+    plo.margin_top -= 0.04
+    if plo.interactive:
+        # make room for the slider
+        plo.margin_top -= 0.02
+        plo.margin_right = 0.6
+        if plo.cont_standard:
+            plo.margin_right -= 0.1
+        axs = fig.add_axes([0.3, plo.margin_top+0.04, plo.margin_right, 0.025])
+        sli = Slider(axs, 'Energy [keV] ', valmin=lmt.ener_min, valmax=lmt.ener_max, valinit=geo.ener, handle_style={'size':plo.label_size}, valstep=lmt.ener_stp, color=plo.plot_handle_color)
+        sli.vline.set_alpha(0) # Remove the mark on the slider
+        sli.on_changed(lambda val: update_scene('ener', val, scn))
+        sli.label.set_size(plo.label_size)
+        sli.valtext.set_size(plo.label_size)
+        scn.widgets.append(sli)
+        # figure out a proper size of the axis
+        _ds = 1.0 - (plo.margin_top+0.03)
+        if plo.action_radio:
+            axs_unit = fig.add_axes([0.0, plo.margin_top+0.03, _ds, _ds], frameon=False, aspect='equal')
+            box_unit = RadioButtons(axs_unit, geo.unit_names, active=geo.unit, activecolor=plo.plot_handle_color)
+            box_unit.on_clicked(lambda val: update_scene('unit', geo.unit_names.index(val), scn))
+            for l in box_unit.labels:
+                l.set_size(plo.label_size)
+            scn.widgets.append(box_unit)
+        if plo.cont_standard:
+            axs_std = fig.add_axes([0.85, plo.margin_top+0.03, _ds, _ds], frameon=False, aspect='equal')
+            box_std = RadioButtons(axs_std, geo.std_names, active=geo.std_idx, activecolor=plo.plot_handle_color)
+            box_std.on_clicked(lambda val: update_scene('std', geo.std_names.index(val), scn))
+            for l in box_std.labels:
+                l.set_size(plo.label_size)
+            scn.widgets.append(box_std)
+    else:
+        fig.suptitle(f'Energy: {geo.ener} keV | Units: {geo.unit_names[geo.unit]}', size=10)
+    # adjust the margins
+    fig.subplots_adjust(top=plo.margin_top, bottom=0, right=1, left=0, hspace=0, wspace=0.02)
+    # adjust the figure size
+    fig.set_size_inches(plo.plot_size * plo.margin_top * sum(_grd.get_width_ratios()), plo.plot_size)
+    # create cones and draw contour lines
+    _lev = get_levels(geo, plo)
+    for pan in scn.panels:
+        draw_contours(pan.ax, pan.geo, pan.plo, lev=_lev)
+    return fig, scn
+
+def get_panel_title(pan):
+    return f'{pan.det.name}\nDistance: {pan.geo.dist} mm | Rotation: {pan.geo.rota}° | Tilt: {pan.geo.tilt}° | Offset: {pan.geo.yoff} mm'
 
 def build_detector(bg, det, plo):
     # build detector modules
+    # all modules are drawn as a single collection
+    _mod = get_modules(det)
+    # the corners of the modules (N, 4, 2)
+    _verts = np.stack((_mod[:,[0,1]], _mod[:,[2,1]], _mod[:,[2,3]], _mod[:,[0,3]]), axis=1)
+    bg.add_collection(PolyCollection(_verts, facecolors=plo.module_color, edgecolors=plo.module_color, alpha=plo.module_alpha))
+
+def get_det_dims(det):
+    # half width and half height of the detector [mm]
+    xdim = (det.hms * det.hmn + det.pxs * det.hgp * det.hmn + det.cbh)/2
+    ydim = (det.vms * det.vmn + det.pxs * det.vgp * det.vmn + det.cbh)/2
+    return xdim, ydim
+
+def get_modules(det):
+    # corners (x0, y0, x1, y1) of all modules [mm]
     # beam position is between the modules (even) or at the center module (odd)
     # determined by the "+det.hmn%2" part
-    for i in range(-det.hmn//2+det.hmn%2, det.hmn-det.hmn//2):
-        for j in range(-det.vmn//2+det.vmn%2, det.vmn-det.vmn//2):
-            # - place modules along x (i) and y (j) keeping the gaps in mind ( + (det.hgp*det.pxs)/2)
-            # - the " - ((det.hms+det.hgp*det.pxs)/2)" positions the origin (the beam) at the center of a module
-            #   and "det.hmn%2" makes sure this is only active for detectors with an odd number of modules
-            # - define sets of panels that collectively move to realize a central hole offset for MPCCD detectors
-            #   that are used at SACLA/SPring-8:
-            #   x = (...) + (det.cbh/2)*(2*(j&det.vmn)//det.vmn-1)
-            #   y = (...) + (det.cbh/2)*(1-2*(i&det.hmn)//det.hmn)
-            # - negative values of det.cbh for 'clockwise' offset order
-            origin_x = i*(det.hms+det.hgp*det.pxs) - ((det.hms+det.hgp*det.pxs)/2)*(det.hmn%2) + (det.hgp*det.pxs)/2 + (det.cbh/2)*(2*(j&det.vmn)//det.vmn-1)
-            origin_y = j*(det.vms+det.vgp*det.pxs) - ((det.vms+det.vgp*det.pxs)/2)*(det.vmn%2) + (det.vgp*det.pxs)/2 + (det.cbh/2)*(1-2*(i&det.hmn)//det.hmn)
-            # DEBUG: print indices on panels
-            #bg.annotate(f'{i} {j}', (origin_x+det.hms/2, origin_y+det.vms/2), color='gray', alpha=0.2, size=16, ha='center')
-            # add the module
-            bg.add_patch(patches.Rectangle((origin_x, origin_y),  det.hms, det.vms, color=plo.module_color, alpha=plo.module_alpha))
-
-def draw_contours(ax, geo, plo):
-    # calculate the offset of the contours resulting from yoff and rotation
-    # shift the grid to draw the cones, to make sure the contours are drawn
-    # within the visible area
-    _comp_shift = -(geo.yoff + np.tan(np.deg2rad(geo.rota))*geo.dist)
-    # increase the the cone grid to allow more
-    # contours to be drawn as the plane is tilted
-    _comp_add = np.tan(np.deg2rad(geo.tilt))*geo.dist
-    # draw beam center
-    if plo.cont_norm_inc:
-        ax.plot(0, 0, color=plo.cont_norm_color, marker=plo.cont_norm_cmark, ms=plo.cont_norm_csize, alpha=plo.cont_norm_alpha)
-    ax.plot(0, _comp_shift, color=colors.to_hex(plo.cont_geom_cmap(1)), marker=plo.cont_geom_cmark, ms=plo.cont_geom_csize, alpha=plo.cont_geom_alpha)
-    # draw contour lines
-    for _n,_ttd in enumerate(plo.cont_levels):
+    i, j = np.meshgrid(np.arange(-det.hmn//2+det.hmn%2, det.hmn-det.hmn//2), np.arange(-det.vmn//2+det.vmn%2, det.vmn-det.vmn//2), indexing='ij')
+    i, j = i.ravel(), j.ravel()
+    # - place modules along x (i) and y (j) keeping the gaps in mind ( + (det.hgp*det.pxs)/2)
+    # - the " - ((det.hms+det.hgp*det.pxs)/2)" positions the origin (the beam) at the center of a module
+    #   and "det.hmn%2" makes sure this is only active for detectors with an odd number of modules
+    # - define sets of panels that collectively move to realize a central hole offset for MPCCD detectors
+    #   that are used at SACLA/SPring-8:
+    #   x = (...) + (det.cbh/2)*(2*(j&det.vmn)//det.vmn-1)
+    #   y = (...) + (det.cbh/2)*(1-2*(i&det.hmn)//det.hmn)
+    # - negative values of det.cbh for 'clockwise' offset order
+    origin_x = i*(det.hms+det.hgp*det.pxs) - ((det.hms+det.hgp*det.pxs)/2)*(det.hmn%2) + (det.hgp*det.pxs)/2 + (det.cbh/2)*(2*(j&det.vmn)//det.vmn-1)
+    origin_y = j*(det.vms+det.vgp*det.pxs) - ((det.vms+det.vgp*det.pxs)/2)*(det.vmn%2) + (det.vgp*det.pxs)/2 + (det.cbh/2)*(1-2*(i&det.hmn)//det.hmn)
+    return np.column_stack((origin_x, origin_y, origin_x + det.hms, origin_y + det.vms))
+
+def draw_contours(ax, geo, plo, ctr=None, lev=None):
+    # get the contour lines, cached if possible
+    # and update the contour artists
+    # - ctr: contour lines that are already calculated
+    # - lev: shared levels, see get_levels
+    _perf = plo.cont_perf
+    if ctr is None:
+        ctr = get_contours(geo, plo, _perf, lev=lev)
+    if _perf is not None:
+        _t0 = time.perf_counter()
+    plo.cont_artists.update(ctr, geo, plo)
+    if _perf is not None:
+        _perf.add('labels', _t0)
+        _perf.cur['levels'] = len(ctr.geom)
+        _perf.cur['points'] = ctr.npts
+
+def get_contours(geo, plo, perf=None, cancel=None, lev=None):
+    # look up the contour lines in the cache
+    # and calculate them if they are not there
+    # - None if cancelled, see calc_contours
+    if plo.cont_cache is None:
+        return calc_contours(geo, plo, perf, cancel, lev)
+    _key = plo.cont_cache.key(geo)
+    ctr = plo.cont_cache.get(_key)
+    if ctr is None:
+        ctr = calc_contours(geo, plo, perf, cancel, lev)
+        if ctr is not None:
+            plo.cont_cache.put(_key, ctr)
+    elif perf is not None:
+        perf.cur['cached'] = True
+    return ctr
+
+def get_levels(geo, plo):
+    # the 2-theta levels, their values in all units and the
+    # calibrant rings at the energy of geo, these don't depend
+    # on the detector and are shared by all detectors of a scene
+    lev = container()
+    lev.ener = geo.ener
+    lev.ttr, lev.dsp, lev.units = [], [], []
+    for _ttd in plo.cont_levels:
         # convert theta in degrees to radians
         _ttr = np.deg2rad(_ttd)
-        # calculate ratio of sample to detector distance (sdd)
-        # and contour distance to beam center (cbc)
-        # _rat = sdd/cbc = 1/tan(2-theta)
-        # this is used to scale the cones Z dimension
-        _rat = 1/np.tan(_ttr)
-        # apply the min/max grid resolution
-        _grd_res = max(min(int(plo.cont_reso_min*_rat),plo.cont_reso_max), plo.cont_reso_min)
-        # prepare the grid for the cones/contours
-        # adjust the resolution using i (-> plo.cont_levels),
-        # as smaller cones/contours (large i) need higher sampling
-        # but make sure the sampling rate doesn't fall below the
-        # user set plo.cont_reso_min value and plo.cont_reso_max
-        # prevents large numbers that will take seconds to draw
-        _x0 = np.linspace(-plo.cont_grid_max, plo.cont_grid_max, _grd_res)
-        # the grid position needs to adjusted upon change of geometry
-        # the center needs to be shifted by _geo_offset to make sure 
-        # sll contour lines are drawn
-        _x1 = np.linspace(-plo.cont_grid_max + _comp_shift, plo.cont_grid_max - _comp_shift + _comp_add, _grd_res)
         # Conversion factor keV to Angstrom: 12.398
         # sin(t)/l: np.sin(Theta) / lambda -> (12.398/geo_energy)
         _stl = np.sin(_ttr/2)/(12.398/geo.ener)
         # d-spacing: l = 2 d sin(t) -> 1/2(sin(t)/l)
         _dsp = 1/(2*_stl)
         # prepare the values in the different units / labels
-        _units = {0:np.rad2deg(_ttr), 1:_dsp, 2:_stl*4*np.pi, 3:_stl}
-        # draw additional contours for normal incidence geometry
+        lev.ttr.append(_ttr)
+        lev.dsp.append(_dsp)
+        lev.units.append({0:np.rad2deg(_ttr), 1:_dsp, 2:_stl*4*np.pi, 3:_stl})
+    # standard contour lines
+    lev.std_dsp, lev.std_ttr = None, None
+    if plo.cont_standard and geo.std_idx > 0:
+        # lambda = 2 * d * sin(theta)
+        # 2-theta = 2 * (lambda / 2*d)
+        # lambda -> (12.398/geo_energy)
+        # reflections beyond 180 deg. are NaN
+        lev.std_dsp = plo.cont_std_dsp
+        with np.errstate(invalid='ignore'):
+            lev.std_ttr = 2 * np.arcsin((12.398/geo.ener) / (2*lev.std_dsp))
+    return lev
+
+def calc_contours(geo, plo, perf=None, cancel=None, lev=None):
+    # calculates the contour lines as lists of (N, 2) segments
+    # - ctr.norm: (segments, units) for normal incidence
+    # - ctr.geom: (level index, segments, units) for the current geometry
+    # - ctr.std:  segments of the standard
+    # - ctr.npts: (level index, points) used for the current geometry
+    # - units are the label values in all units, see geo.unit
+    # - perf (perf_stats) collects the stage timings, None: off
+    # - cancel() is checked once per level, returns None if True
+    # - lev: the levels at the energy of geo, see get_levels
+    if lev is None:
+        lev = get_levels(geo, plo)
+    ctr = container()
+    ctr.norm, ctr.geom, ctr.std, ctr.npts = [], [], [], []
+    # calculate the offset of the contours resulting from yoff and rotation
+    # shift the grid to draw the cones, to make sure the contours are drawn
+    # within the visible area
+    _comp_shift = -(geo.yoff + np.tan(np.deg2rad(geo.rota))*geo.dist)
+    # increase the the cone grid to allow more
+    # contours to be drawn as the plane is tilted
+    _comp_add = np.tan(np.deg2rad(geo.tilt))*geo.dist
+    # the beam center
+    ctr.beam_y = _comp_shift
+    # the conic engine draws a contour once it is visible
+    # and stops at the first invisible one after that
+    _seen = False
+    # the grid engine transforms the cones of several levels at once
+    if plo.cont_engine == 'grid':
+        # the grid position needs to adjusted upon change of geometry
+        # the center needs to be shifted by _comp_shift to make sure 
+        # all contour lines are drawn
+        _grd_x0 = (-plo.cont_grid_max, plo.cont_grid_max)
+        _grd_x1 = (-plo.cont_grid_max + _comp_shift, plo.cont_grid_max - _comp_shift + _comp_add)
+        _ttrs = np.array(lev.ttr)
+        # use the offset adjusted range x1 for the moved geometry
+        _cones1 = grid_cones(_ttrs, _grd_x1, _grd_x0, geo.rota, geo.tilt, geo.yoff, geo.dist, plo, perf)
+        if plo.cont_norm_inc:
+            _cones0 = grid_cones(_ttrs, _grd_x0, _grd_x0, 0, 0, 0, geo.dist, plo, perf)
+    # calculate contour lines
+    for _n,_ttr in enumerate(lev.ttr):
+        # a newer geometry is waiting
+        if cancel is not None and cancel():
+            return None
+        _dsp = lev.dsp[_n]
+        _units = lev.units[_n]
+        if plo.cont_engine == 'conic':
+            # additional contours for normal incidence geometry
+            if perf is not None:
+                _t0 = time.perf_counter()
+            if plo.cont_norm_inc:
+                _segs = conic_contour(_ttr, 0, 0, 0, geo.dist, plo)
+                if len(_segs) > 0:
+                    ctr.norm.append((_segs, _units))
+            # contours for the tilted/rotated/moved geometry
+            _segs = conic_contour(_ttr, geo.rota, geo.tilt, geo.yoff, geo.dist, plo)
+            if perf is not None:
+                perf.add('conic', _t0)
+            if len(_segs) > 0:
+                _seen = True
+                ctr.geom.append((_n, _segs, _units))
+                ctr.npts.append((_n, sum(len(_s) for _s in _segs)))
+            elif _seen:
+                # the visible 2-theta range of the detector is continuous
+                # once a contour left the detector, the following ones
+                # will not be visible either
+                # - only True if the contours are iterated low to high!
+                if perf is not None:
+                    perf.cur['skipped'] += len(plo.cont_levels) - _n - 1
+                break
+            continue
+        # additional contours for normal incidence geometry
         if plo.cont_norm_inc:
-            X0, Y0 = np.meshgrid(_x0,_x0)
-            Z0 = np.sqrt(X0**2+Y0**2)*_rat
-            X,Y,Z = geo_cone(X0, Y0, Z0, 0, 0, 0, geo.dist)
+            X,Y,Z = next(_cones0)
             # don't draw contour lines that are out of bounds
             # make sure Z is large enough to draw the contour
             if np.max(Z) >= geo.dist:
-                c0 = ax.contour(X, Y, Z, [geo.dist], colors=plo.cont_norm_color, alpha=plo.cont_norm_alpha)
-                # label original geometry contours
-                fmt = {c0.levels[0]:f'{np.round(_units[geo.unit],2):.2f}'}
-                ax.clabel(c0, c0.levels, inline=True, fontsize=plo.label_size, fmt=fmt, manual=[(plo.xdim,plo.ydim)])
-        # draw contours for the tilted/rotated/moved geometry
-        # use the offset adjusted value x1 to prepare the grid
-        X0, Y0 = np.meshgrid(_x1,_x0)
-        Z0 = np.sqrt(X0**2+Y0**2)*_rat
-        X,Y,Z = geo_cone(X0, Y0, Z0, geo.rota, geo.tilt, geo.yoff, geo.dist)
+                if perf is not None:
+                    _t0 = time.perf_counter()
+                ctr.norm.append((trace_contour(X, Y, Z, geo.dist), _units))
+                if perf is not None:
+                    perf.add('trace', _t0)
+        # contours for the tilted/rotated/moved geometry
+        X,Y,Z = next(_cones1)
+        if perf is not None:
+            perf.cur['grid_res'].append(Z.shape[-1])
         # make sure Z is large enough to draw the contour
         if np.max(Z) > geo.dist:
-            c1 = ax.contour(X, Y, Z, [geo.dist], colors=colors.to_hex(plo.cont_geom_cmap((_n+1)/len(plo.cont_levels))), alpha=plo.cont_geom_alpha)
-            # label moved geometry contours
-            fmt = {c1.levels[0]:f'{np.round(_units[geo.unit],2):.2f}'}
-            ax.clabel(c1, c1.levels, inline=True, fontsize=plo.label_size, fmt=fmt, manual=[(0,plo.ydim)])
+            if perf is not None:
+                _t0 = time.perf_counter()
+            ctr.geom.append((_n, trace_contour(X, Y, Z, geo.dist), _units))
+            ctr.npts.append((_n, Z.size))
+            if perf is not None:
+                perf.add('trace', _t0)
         else:
             # if the Z*i is too small, break as the following cycles
             # will make Z only smaller -> leaving no contours to draw
             # - only True if the contours are iterated high to low!
+            if perf is not None:
+                perf.cur['skipped'] += len(plo.cont_levels) - _n - 1
             break
-    # plot standard contour lines
+    # standard contour lines
     if plo.cont_standard and geo.std_idx > 0:
         # this assumes that the last cycle runs for the highest resolution
         # so _dsp holds the correct maximum value up to which the 
         # satndard contour lines are to be drawn
-        for _d in plo.cont_std_dsp[plo.cont_std_dsp > _dsp]:
-            # lambda = 2 * d * sin(theta)
-            # 2-theta = 2 * (lambda / 2*d)
-            # lambda -> (12.398/geo_energy)
-            _ttr = 2 * np.arcsin((12.398/geo.ener) / (2*_d))
-            # calculate ratio of sample to detector distance (sdd)
-            # and contour distance to beam center (cbc)
-            # _rat = sdd/cbc = 1/tan(2-theta)
-            # this is used to scale the cones Z dimension
-            _rat = 1/np.tan(_ttr)
-            # apply the min/max grid resolution
-            _grd_res = max(min(int(plo.cont_reso_min*_rat),plo.cont_reso_max), plo.cont_reso_min)
-            # prepare the grid for the cones/contours
-            # adjust the resolution using i (-> plo.cont_levels),
-            # as smaller cones/contours (large i) need higher sampling
-            # but make sure the sampling rate doesn't fall below the
-            # user set plo.cont_reso_min value and plo.cont_reso_max
-            # prevents large numbers that will take seconds to draw
-            _x0 = np.linspace(-plo.cont_grid_max, plo.cont_grid_max, _grd_res)
-            # the grid position needs to adjusted upon change of geometry
-            # the center needs to be shifted by _geo_offset to make sure 
-            # sll contour lines are drawn
-            _x1 = np.linspace(-plo.cont_grid_max + _comp_shift, plo.cont_grid_max - _comp_shift + _comp_add, _grd_res)
-            # draw contours for the tilted/rotated/moved geometry
-            # use the offset adjusted value x1 to prepare the grid
-            X0, Y0 = np.meshgrid(_x1,_x0)
-            Z0 = np.sqrt(X0**2+Y0**2)*_rat
-            X,Y,Z = geo_cone(X0, Y0, Z0, geo.rota, geo.tilt, geo.yoff, geo.dist)
+        _ttrs = lev.std_ttr[lev.std_dsp > _dsp]
+        if plo.cont_engine == 'grid':
+            _cones1 = grid_cones(_ttrs, _grd_x1, _grd_x0, geo.rota, geo.tilt, geo.yoff, geo.dist, plo, perf)
+        for _ttr in _ttrs:
+            if cancel is not None and cancel():
+                return None
+            if perf is not None:
+                _t0 = time.perf_counter()
+            if plo.cont_engine == 'conic':
+                _segs = conic_contour(_ttr, geo.rota, geo.tilt, geo.yoff, geo.dist, plo)
+                if len(_segs) > 0:
+                    ctr.std.append(_segs)
+                if perf is not None:
+                    perf.add('conic', _t0)
+                continue
+            # contours for the tilted/rotated/moved geometry
+            X,Y,Z = next(_cones1)
             # make sure Z is large enough to draw the contour
             if np.max(Z) > geo.dist:
-                c1 = ax.contour(X, Y, Z, [geo.dist], colors=plo.cont_std_color, alpha=plo.cont_std_alpha, linewidths=plo.cont_std_lw)
+                if perf is not None:
+                    _t0 = time.perf_counter()
+                ctr.std.append(trace_contour(X, Y, Z, geo.dist))
+                if perf is not None:
+                    perf.add('trace', _t0)
+    # the memory held by the contour lines
+    ctr.nbytes = sum(_s.nbytes for _c in ctr.norm for _s in _c[0])\
+               + sum(_s.nbytes for _c in ctr.geom for _s in _c[1])\
+               + sum(_s.nbytes for _c in ctr.std for _s in _c)
+    return ctr
+
+def trace_contour(X, Y, Z, level):
+    # find the iso-line of Z at level as a list of (N, 2) segments
+    if contour_generator is not None:
+        # same algorithm as matplotlib, returns (segments, codes)
+        return contour_generator(X, Y, Z, name='mpl2014').lines(level)[0]
+    # matplotlib < 3.6 ships its own contour generator
+    return _contour.QuadContourGenerator(X, Y, Z, None, True, 0).create_contour(level)[0]
+
+def grid_cones(ttrs, xlim, ylim, rota, tilt, yoff, dist, plo, perf=None):
+    # yields the transformed cone grids (X, Y, Z) for the
+    # 2-theta values in ttrs (radians), one level at a time
+    # - perf (perf_stats) collects the stage timings, None: off
+    # calculate ratio of sample to detector distance (sdd)
+    # and contour distance to beam center (cbc)
+    # _rat = sdd/cbc = 1/tan(2-theta)
+    # this is used to scale the cones Z dimension
+    _rats = 1/np.tan(ttrs)
+    # apply the min/max grid resolution
+    # adjust the resolution using _rat, as smaller cones/contours
+    # need higher sampling but make sure the sampling rate doesn't
+    # fall below the user set plo.cont_reso_min value and
+    # plo.cont_reso_max prevents large numbers that will take
+    # seconds to draw
+    _res = np.clip((plo.cont_reso_min*_rats).astype(int), plo.cont_reso_min, plo.cont_reso_max)
+    _dtype = np.dtype(plo.cont_grid_dtype)
+    # buffers are reused for batches of the same shape
+    _bufs = {}
+    i = 0
+    while i < len(ttrs):
+        # consecutive levels with the same grid resolution
+        # are transformed together (up to plo.cont_grid_batch)
+        j = i + 1
+        while j < len(ttrs) and j - i < plo.cont_grid_batch and _res[j] == _res[i]:
+            j += 1
+        if perf is not None:
+            _t0 = time.perf_counter()
+        # prepare the grid for the cones/contours
+        X0, Y0 = np.meshgrid(np.linspace(*xlim, _res[i], dtype=_dtype), np.linspace(*ylim, _res[i], dtype=_dtype))
+        _shape = (j-i,) + X0.shape
+        if _shape not in _bufs:
+            _bufs[_shape] = (np.empty(_shape, _dtype), np.empty(_shape, _dtype))
+        _Yb, _Zb = _bufs[_shape]
+        # stack the cones of the batch directly into the buffer
+        np.multiply(np.hypot(X0, Y0), _rats[i:j,None,None], out=_Zb, casting='same_kind')
+        if perf is not None:
+            perf.add('grid', _t0)
+            _t0 = time.perf_counter()
+        # transform the Z buffer in place
+        X,Y,Z = geo_cone_batch(X0, Y0, _Zb, rota, tilt, yoff, dist, out=(_Yb, _Zb))
+        if perf is not None:
+            perf.add('geo_cone', _t0)
+        for k in range(j-i):
+            yield X[k], Y[k], Z[k]
+        i = j
 
 def geo_cone(X, Y, Z, rota, tilt, yoff, dist):
+    # single cone version of geo_cone_batch
+    return geo_cone_batch(X, Y, Z, rota, tilt, yoff, dist)
+
+def geo_cone_batch(X, Y, Z, rota, tilt, yoff, dist, out=None, dtype=None):
+    # transform a stack of cones (levels, ny, nx) in one pass
+    # - X, Y are the grids shared by all levels (ny, nx)
+    #   or have the same shape as Z
+    # - out = (Y, Z) are optional buffers for the results,
+    #   passing Z itself as the second buffer works in place
+    # - dtype sets the precision of new buffers, e.g. np.float32
     # combined rotation, tilt 'movement' is compensated
     a = np.deg2rad(tilt) + np.deg2rad(rota)
-    # rotate the sample around y
-    t = np.transpose(np.array([X,Y,Z]), (1,2,0))
-    # rotation matrix
-    m = [[np.cos(a), 0, np.sin(a)],[0,1,0],[-np.sin(a), 0, np.cos(a)]]
-    # apply rotation
-    X,Y,Z = np.transpose(np.dot(t, m), (2,0,1))
+    _cos, _sin = np.cos(a), np.sin(a)
     # compensate for tilt not rotating
     # - revert the travel distance
     comp = np.deg2rad(tilt) * dist
-    return Y,X+comp-yoff,Z
+    if out is None:
+        _dtype = np.result_type(X, Y, Z) if dtype is None else dtype
+        out = (np.empty(np.shape(Z), _dtype), np.empty(np.shape(Z), _dtype))
+    _Y, _Z = out
+    # rotate the sample around y
+    # - the rotation matrix [[cos, 0, sin], [0, 1, 0], [-sin, 0, cos]]
+    #   only mixes X and Z, Y is passed through as a view
+    # - X' = X cos(a) - Z sin(a), moved by the compensation and offset
+    np.multiply(Z, -_sin, out=_Y, casting='same_kind')
+    _Y += X*_cos + (comp - yoff)
+    # - Z' = X sin(a) + Z cos(a)
+    np.multiply(Z, _cos, out=_Z, casting='same_kind')
+    _Z += X*_sin
+    return np.broadcast_to(Y, np.shape(Z)),_Y,_Z
+
+def geo_cone_inv(x, y, rota, tilt, yoff, dist):
+    # inverse of geo_cone for points (x, y) on the detector
+    # returns the direction (X, Y, Z) of the scattered ray
+    # that hits the detector at (x, y), Z is the beam direction
+    a = np.deg2rad(tilt) + np.deg2rad(rota)
+    comp = np.deg2rad(tilt) * dist
+    # undo the offsets, the detector plane is at Z' = dist
+    _x = y - comp + yoff
+    # rotate back around y
+    return _x*np.cos(a) + dist*np.sin(a), x, dist*np.cos(a) - _x*np.sin(a)
+
+def conic_points(ttr, phi, rota, tilt, yoff, dist):
+    # the intersection of a cone and a plane is a conic section
+    # - the cone is parametrized by its azimuth phi and the
+    #   distance u travelled along the scattered ray
+    # - a point on the cone then is u * (sin(2t)cos(phi), sin(2t)sin(phi), cos(2t))
+    # - the detector plane is found at Z = dist after the rotation applied
+    #   in geo_cone, solving that for u leaves only phi as a variable
+    # - all arguments broadcast against each other
+    # combined rotation, tilt 'movement' is compensated
+    a = np.deg2rad(tilt) + np.deg2rad(rota)
+    # compensate for tilt not rotating
+    comp = np.deg2rad(tilt) * dist
+    # direction of the scattered rays
+    _cx = np.sin(ttr)*np.cos(phi)
+    _cy = np.sin(ttr)*np.sin(phi)
+    _cz = np.cos(ttr)
+    # Z component of the rotated direction
+    # - rays with a non-positive Z component never reach the
+    #   detector, this makes the parabola and hyperbola open
+    _den = _cx*np.sin(a) + _cz*np.cos(a)
+    hit = _den > 1e-12
+    _u = np.where(hit, dist / np.where(hit, _den, 1.0), np.nan)
+    # apply the rotation (X) and the offsets, see geo_cone
+    # the detector x coordinate is the cone Y
+    x = _u*_cy
+    y = _u*(_cx*np.cos(a) - _cz*np.sin(a)) + comp - yoff
+    return x, y, hit
+
+def conic_adaptive(ttr, rota, tilt, yoff, dist, tol, xdim, ydim, num=64, depth=24):
+    # sample the conic section of 2-theta (ttr, radians) so that
+    # the polyline is within tol [mm] of it on the visible area
+    # - starts with num azimuths and halves the intervals where the
+    #   conic at the mid azimuth is further than tol from the chord
+    # - only intervals that reach the visible area (+-xdim, +-ydim)
+    #   are refined, the rest of the ring keeps the coarse sampling
+    # - intervals that leave the detector plane (no hit) are refined
+    #   towards the horizon, at most depth times
+    phi = np.linspace(0, 2*np.pi, num)
+    x, y, hit = conic_points(ttr, phi, rota, tilt, yoff, dist)
+    # intervals to check
+    _chk = np.arange(num-1)
+    for _d in range(depth):
+        _pm = (phi[_chk] + phi[_chk+1])/2
+        xm, ym, hm = conic_points(ttr, _pm, rota, tilt, yoff, dist)
+        # distance of the conic to the chord at the mid azimuth
+        _err = np.hypot(xm - (x[_chk]+x[_chk+1])/2, ym - (y[_chk]+y[_chk+1])/2)
+        # bounding box of the interval, NaN (no hit) is ignored
+        _x0 = np.fmin(np.fmin(x[_chk], x[_chk+1]), xm)
+        _x1 = np.fmax(np.fmax(x[_chk], x[_chk+1]), xm)
+        _y0 = np.fmin(np.fmin(y[_chk], y[_chk+1]), ym)
+        _y1 = np.fmax(np.fmax(y[_chk], y[_chk+1]), ym)
+        with np.errstate(invalid='ignore'):
+            _near = (_x0 <= xdim+tol) & (_x1 >= -xdim-tol) & (_y0 <= ydim+tol) & (_y1 >= -ydim-tol)
+            _split = _near & ~(_err <= tol)
+        if not _split.any():
+            break
+        # insert the mid points
+        i = _chk[_split]
+        phi = np.insert(phi, i+1, _pm[_split])
+        x = np.insert(x, i+1, xm[_split])
+        y = np.insert(y, i+1, ym[_split])
+        hit = np.insert(hit, i+1, hm[_split])
+        # both halves are checked in the next pass
+        i = i + np.arange(len(i))
+        _chk = np.column_stack((i, i+1)).ravel()
+    return phi, x, y, hit
+
+def conic_contour(ttr, rota, tilt, yoff, dist, plo):
+    # contour line of 2-theta (ttr, radians) on the visible area
+    if plo.cont_tol_mm > 0:
+        # sample the azimuth until the tolerance is met
+        phi, x, y, _hit = conic_adaptive(ttr, rota, tilt, yoff, dist, plo.cont_tol_mm, plo.xdim, plo.ydim)
+    else:
+        # sample the azimuth
+        phi = np.linspace(0, 2*np.pi, plo.cont_conic_pts)
+        x, y, _hit = conic_points(ttr, phi, rota, tilt, yoff, dist)
+    # only keep the points on the visible area
+    # and their direct neighbours to make the
+    # lines reach the edges of the axes
+    _vis = _hit & (np.abs(x) <= plo.xdim) & (np.abs(y) <= plo.ydim)
+    if not _vis.any():
+        return []
+    _keep = _hit & (_vis | np.roll(_vis, 1) | np.roll(_vis, -1))
+    # split the curve into continuous segments
+    _edges = np.flatnonzero(np.diff(np.concatenate(([0], _keep.astype(int), [0]))))
+    segs = [np.column_stack((x[i:j], y[i:j])) for i,j in zip(_edges[::2], _edges[1::2]) if j-i > 1]
+    # phi = 0 and phi = 2pi are the same point, join a closing segment
+    if len(segs) > 1 and _keep[0] and _keep[-1]:
+        segs[0] = np.concatenate((segs.pop(), segs[0]))
+    return segs
 
 def add_slider(label, name, left, bottom, width, height, val, vmin, vmax, step, fig, ax, geo, plo):
     axs = fig.add_axes([left, bottom, width, height])
@@ -432,14 +890,6 @@ def add_slider(label, name, left, bottom, width, height, val, vmin, vmax, step,
     return sli
 
 def update_plot(nam, val, fig, geo, plo, ax):
-    ##################################################
-    # This is a sloppy and hacky way to achieve some #
-    #   interactivity without building a proper GUI  #
-    ##################################################
-    # this works with MacOS backend
-    # but seems to have problems with
-    # Tk and Qt Agg backends for which the
-    # radio buttons have to be pressed twice
     if nam == 'dist':
         geo.dist = float(val)
     elif nam == 'rota':
@@ -455,30 +905,1290 @@ def update_plot(nam, val, fig, geo, plo, ax):
     elif nam == 'std':
         geo.std_idx = int(val)
         if geo.std_idx > 0:
-            # get the d spacings for the calibrtant from pyFAI
-            plo.cont_std_dsp = np.array(geo.pyFAI_calibrant.get_calibrant(geo.std_pyFAI[geo.std_idx]).get_dSpacing())
-    # clear the axis
-    # the beam center is a line
-    for _a in ax.lines:
-        _a.remove()
-    # the contour label is a text
-    for _t in ax.texts:
-        _t.remove()
-    # the contour is a collection
-    # and needs some special attention
-    # to make sure all contours are removed
-    while len(ax.collections) > 0:
-        ax.collections.pop()
-    # re-calculate cones and re-draw contours
+            # get the d spacings for the calibrant (cached, pyFAI is only imported if needed)
+            plo.cont_std_dsp = get_calibrant_dsp(geo.std_pyFAI[geo.std_idx], plo)
+    # calculate in the background, the worker
+    # draws the newest result once it's ready
+    if plo.cont_worker is not None:
+        plo.cont_worker.submit(geo)
+        return
+    if plo.cont_perf is not None:
+        plo.cont_perf.begin()
+    # re-calculate cones and update the contours
     draw_contours(ax, geo, plo)
-    # blit the ax
-    if plt.rcParams['backend'] == 'MacOSX':
-        fig.canvas.blit(ax.bbox)
+    show_contours(geo, plo)
+
+def show_contours(geo, plo):
+    # show the updated contours (GUI thread)
+    # get the neighbouring slider positions ready
+    if plo.cont_cache is not None and plo.cont_cache_prefetch:
+        plo.cont_cache.prefetch(geo, plo)
+    # blit the contours
+    if plo.cont_perf is None:
+        plo.cont_artists.refresh()
+    else:
+        # show the timings of the previous frame
+        plo.cont_artists.set_perf(plo.cont_perf)
+        _t0 = time.perf_counter()
+        plo.cont_artists.refresh()
+        plo.cont_perf.add('draw', _t0)
+        plo.cont_perf.end()
+    # report the ring coverage
+    if plo.cont_coverage:
+        print_coverage(get_coverage(geo, plo.cont_det, plo))
+
+def update_scene(nam, val, scn):
+    # update the detectors of a scene, see make_scene
+    # - 'ener', 'unit' and 'std' change all detectors
+    # - (name, index) moves a single detector,
+    #   e.g. update_scene(('dist', 1), 120, scn)
+    if isinstance(nam, tuple):
+        nam, _idx = nam
+        _panels = [scn.panels[_idx]]
+        setattr(_panels[0].geo, nam, float(val))
+        # the title is not blitted
+        _panels[0].title.set_text(get_panel_title(_panels[0]))
+        _panels[0].ax.figure.canvas.draw_idle()
+    else:
+        _panels = scn.panels
+        if nam == 'ener':
+            scn.geo.ener = float(val)
+        elif nam == 'unit':
+            scn.geo.unit = int(val)
+        elif nam == 'std':
+            scn.geo.std_idx = int(val)
+            if scn.geo.std_idx > 0:
+                # get the d spacings for the calibrant (cached, pyFAI is only imported if needed)
+                scn.plo.cont_std_dsp = get_calibrant_dsp(scn.geo.std_pyFAI[scn.geo.std_idx], scn.plo)
+        for pan in _panels:
+            pan.geo.ener = scn.geo.ener
+            pan.geo.unit = scn.geo.unit
+            pan.geo.std_idx = scn.geo.std_idx
+            if scn.geo.std_idx > 0:
+                pan.plo.cont_std_dsp = scn.plo.cont_std_dsp
+    # the levels and calibrant rings are the same for all detectors
+    _lev = get_levels(scn.geo, scn.plo)
+    for pan in _panels:
+        draw_contours(pan.ax, pan.geo, pan.plo, lev=_lev)
+        show_contours(pan.geo, pan.plo)
+
+def ring_coverage(tth, rota, tilt, yoff, dist, det, num=720):
+    ##################################################
+    # Fraction of Debye-Scherrer rings that lands on #
+    #  the modules, gaps, the central hole, outside  #
+    #  the detector or misses the detector plane     #
+    ##################################################
+    # - tth [deg] and the geometry broadcast against each other,
+    #   e.g. all rings of one geometry or one ring for many geometries
+    # - the rings are sampled at num azimuthal positions
+    #   and checked against all modules at once
+    _shp = np.broadcast(tth, rota, tilt, yoff, dist).shape
+    _e = lambda v: np.asarray(v, dtype=float)[...,None]
+    phi = np.linspace(0, 2*np.pi, num, endpoint=False)
+    x, y, hit = conic_points(np.deg2rad(_e(tth)), phi, _e(rota), _e(tilt), _e(yoff), _e(dist))
+    x, y, hit = np.broadcast_to(x, _shp+(num,)), np.broadcast_to(y, _shp+(num,)), np.broadcast_to(hit, _shp+(num,))
+    _mod = get_modules(det)
+    # points on any module (..., num, modules) -> (..., num)
+    with np.errstate(invalid='ignore'):
+        _on = ((x[...,None] >= _mod[:,0]) & (x[...,None] < _mod[:,2]) & (y[...,None] >= _mod[:,1]) & (y[...,None] < _mod[:,3])).any(axis=-1)
+        # points within the outline of the detector
+        _in = (x >= _mod[:,0].min()) & (x < _mod[:,2].max()) & (y >= _mod[:,1].min()) & (y < _mod[:,3].max())
+        # the central hole around the nominal beam position
+        _hole = (np.abs(x) <= abs(det.cbh)/2 + det.hgp*det.pxs/2) & (np.abs(y) <= abs(det.cbh)/2 + det.vgp*det.pxs/2) & (det.cbh != 0)
+    cov = {}
+    cov['active'] = _on.mean(axis=-1)
+    cov['hole'] = (_in & _hole & ~_on).mean(axis=-1)
+    cov['gap'] = (_in & ~_hole & ~_on).mean(axis=-1)
+    cov['off'] = (hit & ~_in).mean(axis=-1)
+    cov['miss'] = (~hit).mean(axis=-1)
+    return cov
+
+def point_info(x, y, geo, det):
+    # 2-theta [deg], d-spacing, q, sin(theta)/lambda, module index
+    # and status ('module', 'gap', 'hole', 'off') at the detector
+    # positions (x, y) [mm], x and y broadcast
+    # - closed form inverse of geo_cone, no contours needed
+    X, Y, Z = geo_cone_inv(x, y, geo.rota, geo.tilt, geo.yoff, geo.dist)
+    _ttr = np.arctan2(np.hypot(X, Y), Z)
+    # sin(t)/l: np.sin(Theta) / lambda -> (12.398/geo_energy)
+    _stl = np.sin(_ttr/2)/(12.398/geo.ener)
+    # module under the position, -1 if none
+    _mod = get_modules(det)
+    _x, _y = np.asarray(x, dtype=float)[...,None], np.asarray(y, dtype=float)[...,None]
+    _on = (_x >= _mod[:,0]) & (_x < _mod[:,2]) & (_y >= _mod[:,1]) & (_y < _mod[:,3])
+    module = np.where(_on.any(axis=-1), _on.argmax(axis=-1), -1)
+    # outline and central hole, see ring_coverage
+    _x, _y = _x[...,0], _y[...,0]
+    _in = (_x >= _mod[:,0].min()) & (_x < _mod[:,2].max()) & (_y >= _mod[:,1].min()) & (_y < _mod[:,3].max())
+    _hole = (np.abs(_x) <= abs(det.cbh)/2 + det.hgp*det.pxs/2) & (np.abs(_y) <= abs(det.cbh)/2 + det.vgp*det.pxs/2) & (det.cbh != 0)
+    status = np.select([module >= 0, _in & _hole, _in], ['module', 'hole', 'gap'], 'off')
+    with np.errstate(divide='ignore'):
+        _dsp = 1/(2*_stl)
+    return {'tth':np.rad2deg(_ttr), 'dsp':_dsp, 'q':_stl*4*np.pi, 'stl':_stl, 'module':module, 'status':status}
+
+def get_coverage(geo, det, plo):
+    # ring coverage of the contour levels and the
+    # standard (if selected) for the current geometry
+    cov = {'levels':ring_coverage(plo.cont_levels, geo.rota, geo.tilt, geo.yoff, geo.dist, det)}
+    cov['levels']['tth'] = plo.cont_levels
+    if plo.cont_standard and geo.std_idx > 0:
+        # lambda = 2 * d * sin(theta), skip reflections beyond 180 deg.
+        _arg = (12.398/geo.ener) / (2*plo.cont_std_dsp)
+        _tth = np.rad2deg(2 * np.arcsin(_arg[_arg <= 1]))
+        cov['std'] = ring_coverage(_tth, geo.rota, geo.tilt, geo.yoff, geo.dist, det)
+        cov['std']['tth'] = _tth
+        cov['std']['dsp'] = plo.cont_std_dsp[_arg <= 1]
+    return cov
+
+def print_coverage(cov):
+    # print the coverage table
+    for _k in cov:
+        print(f'{_k:>6} {"2-Theta":>8} {"active":>7} {"gap":>7} {"hole":>7} {"off":>7} {"miss":>7}')
+        for _i, _t in enumerate(cov[_k]['tth']):
+            print(f'{"":>6} {_t:8.2f} ' + ' '.join(f'{cov[_k][_n][_i]:7.1%}' for _n in ['active', 'gap', 'hole', 'off', 'miss']))
+
+def resolution_limits(ener, dist, rota, tilt, yoff, det):
+    ##################################################
+    # Resolution limits of the detector in closed    #
+    #  form, vectorized over all geometry parameters #
+    ##################################################
+    # - tth_max / dsp_min: the largest 2-theta on the detector
+    #   and its d-spacing (on the outline, or 180 deg if the
+    #   detector is turned into the backscatter direction)
+    # - tth_ring / dsp_ring: the largest 2-theta whose ring is
+    #   complete on the detector, NaN if the beam misses it
+    # - the detector outline is used, gaps and the central
+    #   hole are ignored, see ring_coverage for those
+    # - all arguments broadcast against each other, angles in deg
+    xdim, ydim = get_det_dims(det)
+    a = np.deg2rad(tilt) + np.deg2rad(rota)
+    comp = np.deg2rad(tilt) * dist
+    _cos, _sin = np.cos(a), np.sin(a)
+    # the scattered ray to a point (x, y) on the detector
+    # is linear in x and y, see geo_cone_inv:
+    # p = p0 + x*(0, 1, 0) + y*(cos(a), 0, -sin(a))
+    _x0 = yoff - comp
+    _p0 = (_x0*_cos + dist*_sin, 0.0, dist*_cos - _x0*_sin)
+    def ray(x, y):
+        return np.stack(np.broadcast_arrays(_p0[0] + y*_cos, _p0[1] + x, _p0[2] - y*_sin))
+    # corners and edges (P to Q) of the detector
+    _crn = [(-xdim, -ydim), (xdim, -ydim), (xdim, ydim), (-xdim, ydim)]
+    _cos2t = []
+    for i in range(4):
+        P = ray(*_crn[i])
+        d = ray(*_crn[(i+1)%4]) - P
+        # cos(2-theta) along the edge is (A + B t)/sqrt(C + 2D t + E t^2)
+        # with only one extremum at t = (A D - B C)/(B D - A E)
+        A, B = P[2], d[2]
+        C, D, E = (P*P).sum(0), (P*d).sum(0), (d*d).sum(0)
+        _den = B*D - A*E
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.clip(np.where(_den != 0, (A*D - B*C)/np.where(_den != 0, _den, 1), 0), 0, 1)
+        for _t in [np.zeros_like(t), t]:
+            _cos2t.append((A + B*_t)/np.sqrt(C + 2*D*_t + E*_t**2))
+    _cos2t = np.clip(np.stack(_cos2t), -1, 1)
+    tth_max = np.rad2deg(np.arccos(_cos2t.min(0)))
+    tth_ring = np.rad2deg(np.arccos(_cos2t.max(0)))
+    # the beam axis meets the detector plane at x = 0, y = comp - yoff - dist tan(a),
+    # in beam direction for cos(a) > 0, backwards (2-theta = 180) for a > 90 deg
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _axis = np.abs(comp - yoff - dist*np.tan(a)) < ydim
+    tth_ring = np.where((_cos > 0) & _axis, tth_ring, np.nan)
+    # the only extremum inside the outline
+    tth_max = np.where((_cos < 0) & _axis, 180.0, tth_max)
+    # the energy only enters the d-spacings, all
+    # results have the shape of all arguments
+    _shp = np.broadcast(ener, dist, rota, tilt, yoff).shape
+    tth_max = np.broadcast_to(tth_max, _shp)
+    tth_ring = np.broadcast_to(tth_ring, _shp)
+    # lambda = 2 d sin(theta), lambda -> (12.398/geo_energy)
+    _lam = 12.398/np.broadcast_to(np.asarray(ener, dtype=float), _shp)
+    with np.errstate(divide='ignore'):
+        return {'tth_max':tth_max, 'dsp_min':_lam/(2*np.sin(np.deg2rad(tth_max)/2)),
+                'tth_ring':tth_ring, 'dsp_ring':_lam/(2*np.sin(np.deg2rad(tth_ring)/2))}
+
+def resolution_map(geo, det, lmt, vary=('dist', 'ener'), num=None):
+    # resolution limits on a grid of the parameters in vary
+    # - the varied parameters span the lmt range in lmt steps
+    #   (or num values), the others are taken from geo
+    # - returns the parameter values and the limits, the
+    #   axes of the limits follow the order in vary
+    axes = OrderedDict()
+    for _n in vary:
+        if num is None:
+            axes[_n] = np.arange(getattr(lmt, f'{_n}_min'), getattr(lmt, f'{_n}_max') + getattr(lmt, f'{_n}_stp')/2, getattr(lmt, f'{_n}_stp'))
+        else:
+            axes[_n] = np.linspace(getattr(lmt, f'{_n}_min'), getattr(lmt, f'{_n}_max'), num)
+    _par = {}
+    for _n in ['ener', 'dist', 'rota', 'tilt', 'yoff']:
+        if _n in axes:
+            # open grid, every parameter gets its own axis
+            _shp = [1]*len(axes)
+            _shp[list(axes).index(_n)] = -1
+            _par[_n] = axes[_n].reshape(_shp)
+        else:
+            _par[_n] = getattr(geo, _n)
+    return axes, resolution_limits(det=det, **_par)
+
+def plot_resolution_map(geo, det, lmt, x='dist', y='ener', limit='dsp_min', num=None, plo=None):
+    # heatmap of a resolution limit over two parameters
+    # the other parameters are fixed at geo (a slice)
+    axes, res = resolution_map(geo, det, lmt, vary=(y, x), num=num)
+    _names = {'ener':'Energy [keV]', 'dist':'Distance [mm]', 'rota':'Rotation [˚]', 'tilt':'Tilt [˚]', 'yoff':'Offset [mm]'}
+    _label = {'dsp_min':r'$d_{min}$ [$\AA$] (corner)', 'dsp_ring':r'$d_{min}$ [$\AA$] (full ring)',
+              'tth_max':r'2$\theta_{max}$ [˚] (corner)', 'tth_ring':r'2$\theta_{max}$ [˚] (full ring)'}
+    _cmap = plo.cont_geom_cmap_name if plo is not None else 'viridis'
+    # d-spacings diverge where the 2-theta limit goes to zero
+    _log = limit.startswith('dsp')
+    fig, ax = plt.subplots()
+    _img = ax.pcolormesh(axes[x], axes[y], res[limit], cmap=_cmap, shading='nearest', norm=colors.LogNorm() if _log else None)
+    # label some iso-lines
+    if np.isfinite(res[limit]).any():
+        _ctr = ax.contour(axes[x], axes[y], res[limit], colors='w', linewidths=0.5, locator=ticker.LogLocator(subs=(1, 2, 5)) if _log else None)
+        ax.clabel(_ctr, fontsize=8)
+    fig.colorbar(_img, ax=ax, label=_label[limit])
+    ax.set_xlabel(_names[x])
+    ax.set_ylabel(_names[y])
+    _fix = ' | '.join(f'{_names[_n].split()[0]}: {getattr(geo, _n)}' for _n in _names if _n not in [x, y])
+    ax.set_title(f'{det.name}\n{_fix}', size=10)
+    return fig, ax
+
+def eval_geometries(dist, rota, tilt, yoff, ener, det, rings=None, num=360):
+    # resolution limits and ring coverage of a batch of
+    # candidate geometries (1d arrays), see optimize_geometry
+    out = resolution_limits(ener, dist, rota, tilt, yoff, det)
+    if rings is not None and len(rings) > 0:
+        # lambda = 2 * d * sin(theta), NaN beyond 180 deg.
+        with np.errstate(invalid='ignore'):
+            out['rings'] = np.rad2deg(2 * np.arcsin((12.398/ener) / (2*np.asarray(rings, dtype=float))))
+        # active fraction (rings, candidates)
+        out['active'] = ring_coverage(out['rings'][:,None], rota, tilt, yoff, dist, det, num=num)['active']
+    return out
+
+def optimize_geometry(geo, det, lmt, dsp=None, rings=None, active=0.0, full=False, min_dist=None, max_angle=None,
+                      objective='dist', num=8, refine=3, top=5, batch=1024, workers=None):
+    ##################################################
+    # Search the detector placement (dist, rota,     #
+    #  tilt, yoff) that meets the requirements       #
+    ##################################################
+    # - dsp:       target d-spacing [A] that needs to be on the detector
+    # - rings:     d-spacings [A] of rings that need to be on the
+    #              active modules, e.g. get_calibrant_dsp('LaB6', plo)[:5]
+    # - active:    minimum active fraction of every ring in rings
+    # - full:      dsp and rings need to be complete rings
+    # - min_dist:  minimum distance [mm]
+    # - max_angle: maximum of rotation + tilt [deg]
+    # - objective: among the valid geometries prefer
+    #              'dist'   the largest distance (angular resolution)
+    #              'dsp'    the smallest d-spacing (resolution)
+    #              'active' the largest active fraction of the rings
+    # - the energy is taken from geo, the parameters stay within lmt
+    # - a grid of num values per parameter is evaluated in batches of
+    #   batch candidates (on workers processes if given), then refined
+    #   refine times around the top candidates and finally rounded
+    #   to the slider steps
+    # - returns the top candidates, best first, as containers with
+    #   dist, rota, tilt, yoff, the limits, the ring coverage and
+    #   the violation of the requirements (0: valid)
+    names = ['dist', 'rota', 'tilt', 'yoff']
+    if objective not in ['dist', 'dsp', 'active']:
+        print(f'Error: Valid objectives are dist, dsp and active, objective={objective}')
+        raise SystemExit
+    _lo = {_n:getattr(lmt, f'{_n}_min') for _n in names}
+    _hi = {_n:getattr(lmt, f'{_n}_max') for _n in names}
+    if min_dist is not None:
+        _lo['dist'] = max(_lo['dist'], min_dist)
+    if max_angle is not None:
+        _hi['rota'] = min(_hi['rota'], max_angle)
+        _hi['tilt'] = min(_hi['tilt'], max_angle)
+    if any(_lo[_n] > _hi[_n] for _n in names):
+        print(f'Error: No geometry within the limits, min_dist={min_dist}, max_angle={max_angle}')
+        raise SystemExit
+
+    def evaluate(cand):
+        # violation and score of the candidates (N, 4)
+        _jobs = [(*cand[i:i+batch].T, geo.ener, det, rings) for i in range(0, len(cand), batch)]
+        if _ex is not None and len(_jobs) > 1:
+            _outs = list(_ex.map(eval_geometries, *zip(*_jobs)))
+        else:
+            _outs = [eval_geometries(*_j) for _j in _jobs]
+        res = {_k:np.concatenate([_o[_k] for _o in _outs], axis=-1) for _k in _outs[0] if _k != 'rings'}
+        # relative shortfall of every requirement
+        _vio = np.zeros(len(cand))
+        _lim = res['tth_ring'] if full else res['tth_max']
+        _lim = np.nan_to_num(_lim, nan=0.0)
+        if dsp is not None:
+            _tth = np.rad2deg(2 * np.arcsin(min((12.398/geo.ener) / (2*dsp), 1.0)))
+            _vio += np.clip(_tth - _lim, 0, None)/_tth
+        if 'active' in res:
+            _act = res['active']
+            _vio += np.clip(max(active, 1e-6) - _act, 0, None).sum(axis=0)
+            if full:
+                _tth = np.nan_to_num(_outs[0]['rings'], nan=180.0)
+                _vio += (np.clip(_tth[:,None] - _lim, 0, None)/_tth[:,None]).sum(axis=0)
+        if max_angle is not None:
+            _vio += np.clip(cand[:,1] + cand[:,2] - max_angle, 0, None)/max(max_angle, 1.0)
+        # the objective, larger is better
+        if objective == 'dist':
+            _score = cand[:,0]
+        elif objective == 'dsp':
+            _score = -np.nan_to_num(res['dsp_ring'] if full else res['dsp_min'], nan=np.inf)
+        else:
+            _score = res['active'].mean(axis=0) if 'active' in res else np.zeros(len(cand))
+        return _vio, _score, res
+
+    def grid(lo, hi, n):
+        # all combinations of n values between lo and hi
+        _ax = [np.linspace(lo[_n], hi[_n], n) if hi[_n] > lo[_n] else np.array([lo[_n]]) for _n in names]
+        return np.stack(np.meshgrid(*_ax, indexing='ij'), axis=-1).reshape(-1, len(names))
+
+    # the worker processes are kept for all passes
+    _ex = ProcessPoolExecutor(max_workers=workers) if workers is not None and workers > 1 else None
+    try:
+        # coarse grid over the limits
+        cand = grid(_lo, _hi, num)
+        _step = {_n:(_hi[_n] - _lo[_n])/max(num-1, 1) for _n in names}
+        for _r in range(refine + 1):
+            _vio, _score, res = evaluate(cand)
+            # fewest violations first, then the best score
+            _best = cand[np.lexsort((-_score, _vio))[:top]]
+            if _r == refine:
+                break
+            # finer grids around the best candidates
+            cand = np.unique(np.concatenate([grid({_n:max(_c[i] - _step[_n], _lo[_n]) for i,_n in enumerate(names)},
+                                                  {_n:min(_c[i] + _step[_n], _hi[_n]) for i,_n in enumerate(names)}, 5) for _c in _best]), axis=0)
+            _step = {_n:_step[_n]/2 for _n in names}
+        # round to the slider steps and evaluate again
+        _stp = np.array([getattr(lmt, f'{_n}_stp') for _n in names])
+        cand = np.unique(np.clip(np.round(cand/_stp)*_stp, [_lo[_n] for _n in names], [_hi[_n] for _n in names]), axis=0)
+        _vio, _score, res = evaluate(cand)
+    finally:
+        if _ex is not None:
+            _ex.shutdown()
+    best = []
+    for i in np.lexsort((-_score, _vio))[:top]:
+        _b = container()
+        for j, _n in enumerate(names):
+            setattr(_b, _n, float(cand[i,j]))
+        _b.ener = geo.ener
+        _b.dsp_min = float(res['dsp_min'][i])
+        _b.dsp_ring = float(res['dsp_ring'][i])
+        _b.active = res['active'][:,i] if 'active' in res else None
+        _b.violation = float(_vio[i])
+        best.append(_b)
+    return best
+
+def get_calibrant_dsp(name, plo):
+    # d-spacings of a calibrant
+    # - memoized in calibrant_memo
+    # - persisted to plo.cache_dir/calibrants.npz, keyed by
+    #   name and pyFAI version, pyFAI is only imported
+    #   for calibrants that are not in there
+    if name in calibrant_memo:
+        return calibrant_memo[name]
+    # the version is read without importing pyFAI
+    try:
+        _ver = importlib.metadata.version('pyFAI')
+    except importlib.metadata.PackageNotFoundError:
+        print(f'Error: pyFAI is needed for the {name} standard, add it as custom standard or install pyFAI')
+        raise SystemExit
+    _key = f'{name}|{_ver}'
+    _file = os.path.join(plo.cache_dir, 'calibrants.npz')
+    _data = {}
+    if os.path.exists(_file):
+        with np.load(_file) as _npz:
+            _data = dict(_npz)
+    if _key not in _data:
+        from pyFAI import calibrant
+        _data[_key] = np.array(calibrant.get_calibrant(name).get_dSpacing())
+        os.makedirs(plo.cache_dir, exist_ok=True)
+        # np.savez adds .npz to names that don't end with it
+        _tmp = os.path.join(plo.cache_dir, f'calibrants.{os.getpid()}.part.npz')
+        np.savez_compressed(_tmp, **_data)
+        os.replace(_tmp, _file)
+    calibrant_memo[name] = _data[_key]
+    return calibrant_memo[name]
+
+def register_calibrant(name, path):
+    # add a calibrant from a d-spacing file
+    # - one d-spacing [A] per line in the first column
+    # - lines starting with # are comments (pyFAI .D files)
+    _dsp = np.loadtxt(path, usecols=0, comments='#', ndmin=1)
+    # the contours expect decreasing d-spacings
+    calibrant_memo[name] = np.sort(_dsp)[::-1]
+    return calibrant_memo[name]
+
+def get_pixel_coords(det):
+    # pixel center coordinates [mm] of the full detector
+    # pixel (0, 0) is the lower left corner, rows run along y
+    xdim, ydim = get_det_dims(det)
+    nx, ny = int(round(2*xdim/det.pxs)), int(round(2*ydim/det.pxs))
+    return -xdim + (np.arange(nx)+0.5)*det.pxs, -ydim + (np.arange(ny)+0.5)*det.pxs
+
+def get_module_slices(det):
+    # pixel index ranges (c0, r0, c1, r1) of all modules, end exclusive
+    # a pixel belongs to a module if its center lies on it
+    xdim, ydim = get_det_dims(det)
+    _mod = get_modules(det)
+    _cols = np.ceil((_mod[:,[0,2]] + xdim)/det.pxs - 0.5 - 1e-9).astype(int)
+    _rows = np.ceil((_mod[:,[1,3]] + ydim)/det.pxs - 0.5 - 1e-9).astype(int)
+    return np.column_stack((_cols[:,0], _rows[:,0], _cols[:,1], _rows[:,1]))
+
+def get_geo_hash(geo, det, plo):
+    # identifies the geometry of the pixel maps
+    _key = {'geo':[float(geo.ener), float(geo.dist), float(geo.rota), float(geo.tilt), float(geo.yoff)],
+            'det':[det.hms, det.vms, det.pxs, det.hgp, det.vgp, det.hmn, det.vmn, det.cbh],
+            'dtype':np.dtype(plo.pix_dtype).name}
+    return hashlib.sha1(json.dumps(_key, sort_keys=True).encode()).hexdigest()[:16]
+
+def get_pixel_maps(geo, det, plo):
+    ##################################################
+    # Per pixel 2-theta, q, d-spacing, sin(t)/lambda #
+    ##################################################
+    # - the maps are memory-mapped .npy files in plo.cache_dir,
+    #   named by the geometry hash, that are only calculated once
+    # - pixels in gaps, the central hole or outside are NaN
+    # - the maps are calculated in chunks of plo.pix_chunk rows
+    names = ['tth', 'q', 'dsp', 'stl']
+    _path = os.path.join(plo.cache_dir, 'maps', get_geo_hash(geo, det, plo))
+    _files = {_n:os.path.join(_path, f'{_n}.npy') for _n in names}
+    if not all(os.path.exists(_f) for _f in _files.values()):
+        os.makedirs(_path, exist_ok=True)
+        _x, _y = get_pixel_coords(det)
+        _slc = get_module_slices(det)
+        # write to temporary files first, a map is
+        # only complete once all chunks are written
+        _maps = {_n:np.lib.format.open_memmap(f'{_f}.part', mode='w+', dtype=plo.pix_dtype, shape=(len(_y), len(_x))) for _n,_f in _files.items()}
+        for r0 in range(0, len(_y), plo.pix_chunk):
+            r1 = min(r0 + plo.pix_chunk, len(_y))
+            # the active area of the chunk
+            _act = np.zeros((r1-r0, len(_x)), dtype=bool)
+            for c0, m0, c1, m1 in _slc:
+                if m1 > r0 and m0 < r1:
+                    _act[max(m0-r0, 0):m1-r0, c0:c1] = True
+            X, Y, Z = geo_cone_inv(_x[None,:], _y[r0:r1,None], geo.rota, geo.tilt, geo.yoff, geo.dist)
+            _ttr = np.arctan2(np.hypot(X, Y), Z)
+            _ttr[~_act] = np.nan
+            # sin(t)/l: np.sin(Theta) / lambda -> (12.398/geo_energy)
+            _stl = np.sin(_ttr/2)/(12.398/geo.ener)
+            _maps['tth'][r0:r1] = np.rad2deg(_ttr)
+            _maps['stl'][r0:r1] = _stl
+            _maps['q'][r0:r1] = _stl*4*np.pi
+            with np.errstate(divide='ignore'):
+                _maps['dsp'][r0:r1] = 1/(2*_stl)
+        for _n,_f in _files.items():
+            _maps[_n].flush()
+            del _maps[_n]
+            os.replace(f'{_f}.part', _f)
+    return {_n:np.load(_f, mmap_mode='r') for _n,_f in _files.items()}
+
+def get_pixel_mask(det):
+    # bit-packed pixel mask of the full detector (pyFAI convention)
+    # - 1 for pixels in the gaps, the central hole or outside
+    #   the modules, 0 for active pixels
+    # - rows are packed along x (np.packbits), shape (ny, ceil(nx/8))
+    # - the modules are rectangles: the detector splits into bands
+    #   of rows with the same pattern and every band is packed once
+    _x, _y = get_pixel_coords(det)
+    nx, ny = len(_x), len(_y)
+    _slc = get_module_slices(det)
+    packed = np.empty((ny, (nx+7)//8), dtype=np.uint8)
+    # rows where the pattern changes
+    _rows = np.unique(np.concatenate(([0, ny], np.clip(_slc[:,[1,3]].ravel(), 0, ny))))
+    for r0, r1 in zip(_rows[:-1], _rows[1:]):
+        _row = np.ones(nx, dtype=bool)
+        for c0, m0, c1, m1 in _slc:
+            if m0 <= r0 and m1 >= r1:
+                _row[max(c0, 0):c1] = False
+        packed[r0:r1] = np.packbits(_row)
+    return packed, (ny, nx)
+
+def save_pixel_mask(path, det):
+    # compressed .npz of the bit-packed mask and its shape
+    packed, shape = get_pixel_mask(det)
+    np.savez_compressed(path, mask=packed, shape=shape)
+
+def load_pixel_mask(path):
+    # full size boolean mask, True: masked
+    with np.load(path) as _f:
+        return np.unpackbits(_f['mask'], axis=1, count=int(_f['shape'][1])).view(bool)
+
+def get_poni(geo, det):
+    # pyFAI geometry of the current geometry (lengths in m, angles in rad)
+    # - dim1 (rows) runs along y, dim2 (columns) along x, the
+    #   origin is the corner of pixel (0, 0), see get_pixel_coords
+    # - the point of normal incidence (PONI) lies at x = 0 and
+    #   y = comp - yoff, see geo_cone
+    # - rotation and tilt turn the detector around the x axis (rot2)
+    xdim, ydim = get_det_dims(det)
+    _x, _y = get_pixel_coords(det)
+    comp = np.deg2rad(geo.tilt) * geo.dist
+    return {'Detector':'Detector',
+            'Detector_config':{'pixel1':det.pxs*1e-3, 'pixel2':det.pxs*1e-3, 'max_shape':[len(_y), len(_x)]},
+            'Distance':geo.dist*1e-3,
+            'Poni1':(comp - geo.yoff + ydim)*1e-3,
+            'Poni2':xdim*1e-3,
+            'Rot1':0.0,
+            'Rot2':-(np.deg2rad(geo.tilt) + np.deg2rad(geo.rota)),
+            'Rot3':0.0,
+            'Wavelength':12.398/geo.ener*1e-10}
+
+def save_poni(path, geo, det):
+    # PONI file (version 2) that pyFAI.load() reads
+    _poni = get_poni(geo, det)
+    with open(path, 'w') as _f:
+        _f.write('# Nota: C-Order, 1 refers to the Y axis, 2 to the X axis\n')
+        _f.write(f'# {det.name} | Energy: {geo.ener} keV | Distance: {geo.dist} mm | Rotation: {geo.rota}° | Tilt: {geo.tilt}° | Offset: {geo.yoff} mm\n')
+        _f.write('poni_version: 2\n')
+        for _k, _v in _poni.items():
+            _f.write(f'{_k}: {json.dumps(_v) if isinstance(_v, dict) else _v}\n')
+
+def get_sweep_params(spec):
+    ##################################################
+    # Translate a sweep specification into the       #
+    #  parameters of the single renders              #
+    ##################################################
+    # spec is a dictionary, e.g. read from a .json file:
+    # {"ener":[21.0, 30.0], "dist":{"min":40, "max":150, "stp":10},
+    #  "rota":{"min":0, "max":75, "num":6}, "det_type":["Eiger2 CdTe"],
+    #  "det_size":["4M", "9M"], "calibrant":["None", "LaB6"]}
+    # - values are lists or ranges given by min/max and stp or num
+    # - keys that are not given are taken from get_specs()
+    # - calibrant names need to be in geo.std_pyFAI
+    keys = ['det_type', 'det_size', 'ener', 'dist', 'rota', 'tilt', 'yoff', 'calibrant']
+    for _k in spec:
+        if _k not in keys:
+            print(f'Error: Unknown sweep parameter {_k}, valid parameters are {", ".join(keys)}')
+            raise SystemExit
+    geo, det, plo, lmt = get_specs()
+    _vals = []
+    for _k in keys:
+        _v = spec.get(_k, geo.std_pyFAI[geo.std_idx] if _k == 'calibrant' else getattr(geo, _k))
+        if isinstance(_v, dict):
+            if 'stp' in _v:
+                # include the maximum if it is on the step grid
+                _v = np.arange(_v['min'], _v['max'] + _v['stp']/2, _v['stp'])
+            else:
+                _v = np.linspace(_v['min'], _v['max'], _v['num'])
+        elif not isinstance(_v, (list, tuple)):
+            _v = [_v]
+        # the geometry is numeric, 30 and 30.0 are the same
+        # render (and file name, see get_sweep_jobs)
+        if _k in ['ener', 'dist', 'rota', 'tilt', 'yoff']:
+            _v = [round(float(_x), 6) for _x in _v]
+        _vals.append(_v)
+    params = []
+    for _c in itertools.product(*_vals):
+        _p = dict(zip(keys, _c))
+        # make sure the detector and calibrant exist before
+        # anything is sent to the workers
+        geo.det_type, geo.det_size = _p['det_type'], _p['det_size']
+        get_det_specs(geo)
+        if _p['calibrant'] not in geo.std_pyFAI:
+            print(f'Error: Unknown calibrant {_p["calibrant"]}, valid calibrants are {", ".join(geo.std_pyFAI)}')
+            raise SystemExit
+        params.append(_p)
+    return params
+
+def get_sweep_jobs(spec, out_dir, fmt='png'):
+    # the renders of a sweep and their file names
+    jobs = []
+    for _p in get_sweep_params(spec):
+        # the file name holds all parameters
+        _name = '_'.join([f'{_p["det_type"]}_{_p["det_size"]}', f'{_p["ener"]}keV', f'{_p["dist"]}mm',
+                          f'{_p["rota"]}rota', f'{_p["tilt"]}tilt', f'{_p["yoff"]}yoff', _p['calibrant']])
+        _name = ''.join(_x if _x.isalnum() or _x in '.-_' else '-' for _x in _name)
+        jobs.append((_p, os.path.join(out_dir, f'{_name}.{fmt}')))
+    return jobs
+
+def render_frame(par, path):
+    # renders a single geometry to a file
+    # runs headless, e.g. in a worker process
+    plt.switch_backend('Agg')
+    geo, det, plo, lmt = get_specs()
+    for _k in ['det_type', 'det_size', 'ener', 'dist', 'rota', 'tilt', 'yoff']:
+        setattr(geo, _k, par[_k])
+    geo.std_idx = geo.std_pyFAI.index(par['calibrant'])
+    det = get_det_specs(geo)
+    plo.interactive = False
+    fig, ax, widgets = make_plot(geo, det, plo, lmt)
+    # write to a temporary file first, a sweep that got
+    # interrupted must not leave incomplete files behind
+    _tmp = f'{path}.part'
+    fig.savefig(_tmp, format=os.path.splitext(path)[1][1:])
+    plt.close(fig)
+    os.replace(_tmp, path)
+    return path
+
+def render_sweep(spec, out_dir, fmt='png', workers=None):
+    ##################################################
+    # Render all combinations of a sweep headless    #
+    #  on a pool of worker processes                 #
+    ##################################################
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = get_sweep_jobs(spec, out_dir, fmt)
+    # resume: skip everything that is already rendered
+    todo = [(_p, _f) for _p, _f in jobs if not os.path.exists(_f)]
+    print(f'Sweep: {len(jobs)} renders, {len(jobs)-len(todo)} done, {len(todo)} to go')
+    if len(todo) == 0:
+        return [_f for _p, _f in jobs]
+    # bound the number of workers
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_frame, _p, _f) for _p, _f in todo]
+        for _i, _f in enumerate(as_completed(futures)):
+            print(f'{_i+1}/{len(todo)}: {_f.result()}')
+    return [_f for _p, _f in jobs]
+
+def render_movie(spec, path, fps=None, workers=None):
+    ##################################################
+    # Render a sweep as movie (.mp4 / .gif, needs    #
+    #  ffmpeg) or as numbered .png files into the    #
+    #  folder path                                   #
+    ##################################################
+    # spec is a sweep specification, see get_sweep_params
+    # e.g. {"ener":25.0, "rota":{"min":0, "max":75, "stp":1}}
+    # - det_type, det_size and calibrant can't change, the
+    #   detector modules are drawn once per worker and only
+    #   the contours and the title are drawn per frame
+    # - the frames are rendered on a pool of worker processes
+    #   and written in order, at most two frames per worker
+    #   are held in memory
+    # - the raw frames are piped to ffmpeg
+    params = get_sweep_params(spec)
+    if len(params) == 0:
+        print('Error: The movie has no frames')
+        raise SystemExit
+    for _k in ['det_type', 'det_size', 'calibrant']:
+        if len(set(_p[_k] for _p in params)) > 1:
+            print(f'Error: {_k} must not change during a movie')
+            raise SystemExit
+    fps = fps or get_specs()[2].movie_fps
+    _fmt = os.path.splitext(path)[1][1:].lower()
+    if _fmt in ['mp4', 'gif']:
+        _ffmpeg = shutil.which(plt.rcParams['animation.ffmpeg_path'])
+        if _ffmpeg is None:
+            print(f'Error: ffmpeg is needed for .{_fmt} movies, write a .png sequence instead (path to a folder)')
+            raise SystemExit
+        todo = [(_p, None) for _p in params]
     else:
-        fig.canvas.draw()
+        # resume: skip the frames that are already rendered
+        os.makedirs(path, exist_ok=True)
+        jobs = [(_p, os.path.join(path, f'frame_{_i:05d}.png')) for _i, _p in enumerate(params)]
+        todo = [(_p, _f) for _p, _f in jobs if not os.path.exists(_f)]
+    print(f'Movie: {len(params)} frames, {len(todo)} to render')
+    # bound the number of workers
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    if _fmt not in ['mp4', 'gif']:
+        if len(todo) == 0:
+            return [_f for _p, _f in jobs]
+        for _i, _f in enumerate(get_movie_frames(todo, params[0], workers)):
+            print(f'{_i+1}/{len(todo)}: {_f}')
+        return [_f for _p, _f in jobs]
+    # encode while rendering, write to a temporary file
+    # first, an interrupted movie must not look complete
+    _tmp = f'{path}.part'
+    _proc = None
+    try:
+        for _i, (_w, _h, _frame) in enumerate(get_movie_frames(todo, params[0], workers)):
+            if _proc is None:
+                _cmd = [_ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                        '-s', f'{_w}x{_h}', '-r', str(fps), '-i', '-']
+                if _fmt == 'mp4':
+                    # yuv420p needs even dimensions
+                    _cmd += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-f', 'mp4']
+                else:
+                    _cmd += ['-vf', 'split[a][b];[a]palettegen[p];[b][p]paletteuse', '-f', 'gif']
+                _proc = subprocess.Popen(_cmd + [_tmp], stdin=subprocess.PIPE)
+            _proc.stdin.write(_frame)
+            print(f'{_i+1}/{len(todo)}', end='\r')
+        _proc.stdin.close()
+        if _proc.wait() != 0:
+            print(f'Error: ffmpeg exited with {_proc.returncode}')
+            raise SystemExit
+    except BaseException:
+        if _proc is not None:
+            _proc.kill()
+            _proc.wait()
+        if os.path.exists(_tmp):
+            os.remove(_tmp)
+        raise
+    os.replace(_tmp, path)
+    print(f'Movie: {path}')
+    return path
+
+def get_movie_frames(todo, par, workers):
+    # yields the rendered frames in order, see render_movie
+    # - par: the first frame, used to set up the workers
+    # - a single worker runs in its own process as well,
+    #   the figures in this process are left alone
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_movie, initargs=(par,)) as pool:
+        _queue = deque()
+        for _p, _f in todo:
+            _queue.append(pool.submit(render_movie_frame, _p, _f))
+            if len(_queue) >= 2*workers:
+                yield _queue.popleft().result()
+        while _queue:
+            yield _queue.popleft().result()
+
+def init_movie(par):
+    # the figure of a movie worker, the detector modules
+    # and everything else that is static is drawn once
+    # and kept as background
+    plt.switch_backend('Agg')
+    geo, det, plo, lmt = get_specs()
+    for _k in ['det_type', 'det_size', 'ener', 'dist', 'rota', 'tilt', 'yoff']:
+        setattr(geo, _k, par[_k])
+    geo.std_idx = geo.std_pyFAI.index(par['calibrant'])
+    det = get_det_specs(geo)
+    plo.interactive = False
+    # every frame is visited once, nothing to cache
+    plo.cont_cache_mb = 0
+    # the labels are placed for the final frame size
+    with plt.rc_context({'figure.dpi':plo.movie_dpi}):
+        fig, ax, widgets = make_plot(geo, det, plo, lmt)
+    # the contours and the title change with every frame
+    _tit = fig.suptitle(get_plot_title(geo, det), size=10)
+    _tit.set_animated(True)
+    plo.cont_artists.set_animated(True)
+    fig.canvas.draw()
+    movie_memo.clear()
+    movie_memo.update({'geo':geo, 'det':det, 'plo':plo, 'fig':fig, 'ax':ax, 'title':_tit,
+                       'bg':fig.canvas.copy_from_bbox(fig.bbox)})
+
+def render_movie_frame(par, path=None):
+    # draws the contours of par onto the background of init_movie
+    # - returns the raw RGBA frame (width, height, bytes)
+    #   or writes it to path (.png)
+    geo, det, plo, fig = movie_memo['geo'], movie_memo['det'], movie_memo['plo'], movie_memo['fig']
+    for _k in ['ener', 'dist', 'rota', 'tilt', 'yoff']:
+        setattr(geo, _k, par[_k])
+    draw_contours(movie_memo['ax'], geo, plo)
+    movie_memo['title'].set_text(get_plot_title(geo, det))
+    fig.canvas.restore_region(movie_memo['bg'])
+    plo.cont_artists.draw_animated()
+    fig.draw_artist(movie_memo['title'])
+    _buf = np.asarray(fig.canvas.buffer_rgba())
+    if path is None:
+        return _buf.shape[1], _buf.shape[0], _buf.tobytes()
+    _tmp = f'{path}.part'
+    plt.imsave(_tmp, _buf, format='png')
+    os.replace(_tmp, path)
+    return path
 
 class container(object):
     pass
 
+##########################
+# Detector Specifications #
+##########################
+# - hms [mm]  Module size (horizontal)
+# - vms [mm]  Module size (vertical)
+# - pxs [mm]  Pixel size
+# - hgp [pix] Gap between modules (horizontal)
+# - vgp [pix] Gap between modules (vertical)
+# - cbh [mm]  Central beam hole
+# - sizes     'Version':(modules horizontal, modules vertical)
+# the module positions are generated by get_modules
+det_registry = {
+    # Specifications for Pilatus3
+    'Pilatus':{'hms':83.8, 'vms':33.5, 'pxs':172e-3, 'hgp':7, 'vgp':17, 'cbh':0,
+               'sizes':{'300K':(1,3),'1M':(2,5),'2M':(3,8),'6M':(5,12)}},
+    # Specifications for Eiger2
+    'Eiger':{'hms':77.1, 'vms':38.4, 'pxs':75e-3, 'hgp':38, 'vgp':12, 'cbh':0,
+             'sizes':{'1M':(1,2),'4M':(2,4),'9M':(3,6),'16M':(4,8)}},
+    # Specifications for MPCCD
+    'MPCCD':{'hms':51.2, 'vms':25.6, 'pxs':50e-3, 'hgp':18, 'vgp':27, 'cbh':3,
+             'sizes':{'4M':(2,4)}},
+}
+
+# d-spacings of the calibrants, see get_calibrant_dsp
+calibrant_memo = {}
+
+# figure of the movie worker, see init_movie
+movie_memo = {}
+
+class contour_artists(object):
+    ##################################################
+    # Persistent contour lines and labels that are   #
+    #  updated in place and blitted onto the cached  #
+    #  background (detector modules and widgets)     #
+    ##################################################
+    # - one line (and label) per contour level, the segments
+    #   of a level are separated by NaN
+    # - blitting is used if the figure is interactive and
+    #   the canvas supports it (Agg, Tk, Qt, MacOSX, ...)
+    #   otherwise the canvas is redrawn when idle
+    # - only the contour axes are blitted, widgets redraw
+    #   themselves without the (animated) contours
+    # - the cursor readout (plo.cont_cursor) is shown in the
+    #   toolbar and, if blitting, as annotation at the mouse
+    #   position that is blitted onto a copy of the contours
+    def __init__(self, fig, ax, plo):
+        self.fig = fig
+        self.ax = ax
+        self.blit = plo.interactive and getattr(fig.canvas, 'supports_blit', False)
+        self.bg = None
+        # the geometry of the contours, see update
+        self.geo = None
+        self.det = plo.cont_det
+        # cursor readout, background with the contours
+        self.cursor = None
+        self.cursor_box = None
+        self.bg_ctr = None
+        if plo.interactive and plo.cont_cursor:
+            ax.format_coord = self.format_coord
+            if self.blit:
+                self.cursor = ax.annotate('', (0, 0), xytext=(12, 12), textcoords='offset points', size=plo.label_size, visible=False, animated=True, clip_on=True,
+                                          bbox={'boxstyle':'round', 'fc':'w', 'ec':plo.module_color, 'alpha':0.9})
+                fig.canvas.mpl_connect('motion_notify_event', self.on_move)
+                fig.canvas.mpl_connect('figure_leave_event', self.on_move)
+        # beam center markers
+        self.beam0 = self.add_line(color=plo.cont_norm_color, marker=plo.cont_norm_cmark, ms=plo.cont_norm_csize, alpha=plo.cont_norm_alpha)
+        self.beam1 = self.add_line(color=colors.to_hex(plo.cont_geom_cmap(1)), marker=plo.cont_geom_cmark, ms=plo.cont_geom_csize, alpha=plo.cont_geom_alpha)
+        # (line, label) pairs of the contour levels and lines of the standard
+        self.norm, self.geom, self.std = [], [], []
+        # frame times, see perf_stats
+        self.perf = None
+        if plo.cont_perf_overlay:
+            self.perf = ax.text(0.01, 0.01, '', transform=ax.transAxes, ha='left', va='bottom', family='monospace',
+                                size=plo.label_size-2, clip_on=True, animated=self.blit)
+        if self.blit:
+            # also called when the figure is saved, see on_draw
+            fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def add_line(self, **kwargs):
+        return self.ax.plot([], [], animated=self.blit, **kwargs)[0]
+
+    def add_label(self, **kwargs):
+        # labels are clipped, only the contour axes are blitted
+        return self.ax.text(0, 0, '', ha='center', va='center', rotation_mode='anchor', clip_on=True, animated=self.blit, **kwargs)
+
+    def artists(self):
+        return [self.beam0, self.beam1] + [_a for _p in self.norm + self.geom for _a in _p] + self.std + ([self.perf] if self.perf else [])
+
+    def set_animated(self, val):
+        for _a in self.artists():
+            _a.set_animated(val)
+
+    def update(self, ctr, geo, plo):
+        self.geo = geo
+        # beam center
+        self.beam0.set_data([0], [0])
+        self.beam0.set_visible(plo.cont_norm_inc)
+        self.beam1.set_data([0], [ctr.beam_y])
+        # make sure there are enough artists
+        while len(self.norm) < len(ctr.norm):
+            self.norm.append((self.add_line(color=plo.cont_norm_color, alpha=plo.cont_norm_alpha),
+                              self.add_label(color=plo.cont_norm_color, alpha=plo.cont_norm_alpha, size=plo.label_size)))
+        while len(self.geom) < len(ctr.geom):
+            self.geom.append((self.add_line(alpha=plo.cont_geom_alpha),
+                              self.add_label(alpha=plo.cont_geom_alpha, size=plo.label_size)))
+        while len(self.std) < len(ctr.std):
+            self.std.append(self.add_line(color=plo.cont_std_color, alpha=plo.cont_std_alpha, lw=plo.cont_std_lw))
+        # normal incidence contours, labelled at the upper right
+        for (_l, _t), (_segs, _units) in zip(self.norm, ctr.norm):
+            self.set_level(_l, _t, _segs, f'{np.round(_units[geo.unit],2):.2f}', (plo.xdim, plo.ydim), plo)
+        # moved geometry contours, labelled at the top center
+        for (_l, _t), (_n, _segs, _units) in zip(self.geom, ctr.geom):
+            _c = colors.to_hex(plo.cont_geom_cmap((_n+1)/len(plo.cont_levels)))
+            _l.set_color(_c)
+            _t.set_color(_c)
+            self.set_level(_l, _t, _segs, f'{np.round(_units[geo.unit],2):.2f}', (0, plo.ydim), plo)
+        for _l, _segs in zip(self.std, ctr.std):
+            _l.set_data(*self.join(_segs).T)
+            _l.set_visible(True)
+        # hide what is not needed
+        for _l, _t in self.norm[len(ctr.norm):] + self.geom[len(ctr.geom):]:
+            _l.set_visible(False)
+            _t.set_visible(False)
+        for _l in self.std[len(ctr.std):]:
+            _l.set_visible(False)
+
+    def set_perf(self, perf):
+        # frame times on the plot
+        if self.perf is not None:
+            self.perf.set_text(perf.text())
+
+    def join(self, segs):
+        # join segments, separated by NaN
+        if len(segs) == 0:
+            return np.empty((0, 2))
+        _nan = np.full((1, 2), np.nan)
+        return np.concatenate([_x for _s in segs for _x in (_s, _nan)][:-1])
+
+    def set_level(self, line, label, segs, text, xy, plo):
+        # place the label on the contour next to xy, rotated
+        # along the line, and cut the line below the label
+        # just like clabel(..., inline=True, manual=[xy])
+        _pts = self.join(segs)
+        _dst = np.hypot(_pts[:,0]-xy[0], _pts[:,1]-xy[1])
+        if np.all(np.isnan(_dst)):
+            line.set_visible(False)
+            label.set_visible(False)
+            return
+        i = np.nanargmin(_dst)
+        # the segment that holds the label
+        _brk = np.flatnonzero(np.isnan(_pts[:,0]))
+        i0 = _brk[_brk < i][-1] + 1 if np.any(_brk < i) else 0
+        i1 = _brk[_brk > i][0] if np.any(_brk > i) else len(_pts)
+        _seg = _pts[i0:i1]
+        k = i - i0
+        # closed rings start at the top, right where the labels
+        # go, move the label to the middle of the segment so
+        # the gap is cut on both sides of it
+        if len(_seg) > 2 and np.allclose(_seg[0], _seg[-1]):
+            _m = (len(_seg)-1)//2
+            _seg = np.roll(_seg[:-1], _m - k, axis=0)
+            _seg = np.concatenate((_seg, _seg[:1]))
+            k = _m
+        # arc length along the segment
+        _len = np.concatenate(([0], np.cumsum(np.hypot(*np.diff(_seg, axis=0).T))))
+        # label width (estimate) and spacing in data units
+        _pxd = self.ax.bbox.width / np.diff(self.ax.get_xlim())[0]
+        _hw = (0.3 * plo.label_size * len(text) * self.fig.dpi/72 + 5) / _pxd
+        _s0, _s1 = _len[k] - _hw, _len[k] + _hw
+        # rotate the label along the line, keep it upright
+        _j0, _j1 = max(k-1, 0), min(k+1, len(_seg)-1)
+        _ang = np.rad2deg(np.arctan2(*(_seg[_j1]-_seg[_j0])[::-1]))
+        _ang = (_ang + 90) % 180 - 90
+        # cut the segment, interpolating the end points
+        _cut = [_seg[_len < _s0]]
+        if _s0 > 0:
+            _cut.append([[np.interp(_s0, _len, _seg[:,0]), np.interp(_s0, _len, _seg[:,1])]])
+        _cut.append([[np.nan, np.nan]])
+        if _s1 < _len[-1]:
+            _cut.append([[np.interp(_s1, _len, _seg[:,0]), np.interp(_s1, _len, _seg[:,1])]])
+        _cut.append(_seg[_len > _s1])
+        line.set_data(*np.concatenate([_pts[:i0]] + _cut + [_pts[i1:]]).T)
+        line.set_visible(True)
+        label.set_text(text)
+        label.set_position(_seg[k])
+        label.set_rotation(_ang)
+        label.set_visible(True)
+
+    def on_draw(self, event):
+        # the figure was drawn without the contours
+        # keep it as background and blit the contours
+        # - savefig skips the animated artists, they are drawn
+        #   by the renderer of the saved file instead
+        if event.canvas.is_saving():
+            for _a in self.artists():
+                if _a.get_visible():
+                    _a.draw(event.renderer)
+            return
+        self.bg = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        for _a in self.artists():
+            if _a.get_visible():
+                self.ax.draw_artist(_a)
+        # keep the contours for the cursor readout
+        if self.cursor is not None:
+            self.bg_ctr = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+            if self.cursor.get_visible():
+                # the geometry changed under the cursor
+                self.cursor.set_text(self.cursor_text(*self.cursor.xy, '\n'))
+                self.ax.draw_artist(self.cursor)
+                self.cursor_box = self.cursor.get_window_extent()
+
+    def cursor_text(self, x, y, sep):
+        # readout at the detector position (x, y)
+        _i = point_info(x, y, self.geo, self.det)
+        _s = f'module {_i["module"]}' if _i['status'] == 'module' else str(_i['status'])
+        return f'2θ {_i["tth"]:.2f}°  d {_i["dsp"]:.3f} Å{sep}q {_i["q"]:.3f} Å⁻¹  sin(θ)/λ {_i["stl"]:.4f}{sep}{_s}'
+
+    def format_coord(self, x, y):
+        # toolbar readout
+        if self.geo is None:
+            return ''
+        return self.cursor_text(x, y, ' | ')
+
+    def on_move(self, event):
+        # move the readout with the mouse, only the old and
+        # the new area of the annotation are blitted
+        if self.bg_ctr is None or self.geo is None:
+            return
+        # the detector axes (bg) lie below the contour axes
+        _in = event.name == 'motion_notify_event' and self.ax.bbox.contains(event.x, event.y)
+        if not _in and not self.cursor.get_visible():
+            return
+        _old = self.cursor_box if self.cursor.get_visible() else None
+        self.cursor.set_visible(_in)
+        if _in:
+            x, y = self.ax.transData.inverted().transform((event.x, event.y))
+            self.cursor.set_text(self.cursor_text(x, y, '\n'))
+            self.cursor.xy = (x, y)
+            # keep the annotation on the axes
+            self.cursor.set_ha('right' if x > 0 else 'left')
+            self.cursor.set_va('top' if y > 0 else 'bottom')
+            self.cursor.set_position((-12 if x > 0 else 12, -12 if y > 0 else 12))
+        self.fig.canvas.restore_region(self.bg_ctr)
+        _box = []
+        if _in:
+            self.ax.draw_artist(self.cursor)
+            self.cursor_box = self.cursor.get_window_extent()
+            _box.append(self.cursor_box)
+        if _old is not None:
+            _box.append(_old)
+        self.fig.canvas.blit(Bbox.intersection(Bbox.union(_box).expanded(1.1, 1.1), self.ax.bbox))
+
+    def refresh(self):
+        # show the updated contours
+        if not self.blit or self.bg is None:
+            self.fig.canvas.draw_idle()
+            return
+        self.fig.canvas.restore_region(self.bg)
+        self.draw_animated()
+        self.fig.canvas.blit(self.ax.bbox)
+
+class contour_cache(object):
+    ##################################################
+    # LRU cache of contour lines on the slider steps #
+    ##################################################
+    # - keys are the exact geometry (rounded to 1e-9 to
+    #   absorb the float noise of the slider steps)
+    # - the neighbouring slider steps are prefetched
+    # - the oldest entries are dropped once the contour
+    #   lines exceed max_mb
+    names = ['ener', 'dist', 'rota', 'tilt', 'yoff']
+
+    def __init__(self, max_mb, lmt):
+        self.max_bytes = max_mb * 2**20
+        self.steps = {_n:getattr(lmt, f'{_n}_stp') for _n in self.names}
+        self.limits = {_n:(getattr(lmt, f'{_n}_min'), getattr(lmt, f'{_n}_max')) for _n in self.names}
+        self.data = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.jobs = None
+
+    def key(self, geo):
+        return tuple(round(float(getattr(geo, _n)), 9) for _n in self.names) + (geo.std_idx,)
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.data:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.data.move_to_end(key)
+            return self.data[key]
+
+    def put(self, key, ctr):
+        with self.lock:
+            if key in self.data:
+                return
+            self.data[key] = ctr
+            self.nbytes += ctr.nbytes
+            # drop the least recently used
+            while self.nbytes > self.max_bytes and len(self.data) > 1:
+                self.nbytes -= self.data.popitem(last=False)[1].nbytes
+
+    def stats(self):
+        with self.lock:
+            _n = self.hits + self.misses
+            return {'hits':self.hits, 'misses':self.misses, 'hit_rate':self.hits/_n if _n else 0.0,
+                    'entries':len(self.data), 'mb':self.nbytes/2**20, 'max_mb':self.max_bytes/2**20}
+
+    def prefetch(self, geo, plo):
+        # queue the neighbouring slider positions of geo
+        # for a background thread, replacing older requests
+        # - the d-spacings of the standard go with the job,
+        #   plo.cont_std_dsp changes with the calibrant picker
+        if self.jobs is None:
+            self.jobs = queue.Queue()
+            threading.Thread(target=self._prefetch, args=(plo,), daemon=True).start()
+        while not self.jobs.empty():
+            try:
+                self.jobs.get_nowait()
+            except queue.Empty:
+                break
+        _dsp = getattr(plo, 'cont_std_dsp', None)
+        for _n in self.names:
+            for _s in [-1, 1]:
+                _geo = copy.copy(geo)
+                # stay within the slider limits
+                _min, _max = self.limits[_n]
+                setattr(_geo, _n, min(max(getattr(geo, _n) + _s*self.steps[_n], _min), _max))
+                self.jobs.put((_geo, _dsp))
+
+    def _prefetch(self, plo):
+        while True:
+            _geo, _dsp = self.jobs.get()
+            _key = self.key(_geo)
+            with self.lock:
+                _known = _key in self.data
+            if _known:
+                continue
+            _plo = copy.copy(plo)
+            _plo.cont_std_dsp = _dsp
+            try:
+                self.put(_key, calc_contours(_geo, _plo))
+            except Exception as e:
+                # a failed prefetch must not stop the thread,
+                # the position is calculated when it's visited
+                print(f'Warning: contour prefetch failed for {_key}: {e}')
+
+class contour_worker(object):
+    ##################################################
+    # Contour lines calculated in a background       #
+    #  thread, drawn on the GUI thread               #
+    ##################################################
+    # - submit() replaces the waiting geometry, a job only
+    #   starts once the sliders rested for plo.cont_async_delay
+    #   or kept moving for plo.cont_async_max [ms]
+    # - a running job is cancelled if a newer geometry comes
+    #   in, unless it was started by plo.cont_async_max, so
+    #   dragging a slider still shows intermediate frames
+    # - a canvas timer picks up the results on the GUI thread,
+    #   older results than the last one drawn are dropped
+    # - with timings (plo.cont_perf) a frame starts at the
+    #   slider event and the calculation is not split up
+    # - a job carries the d-spacings of its standard, the
+    #   GUI thread changes plo.cont_std_dsp, and the result
+    #   is drawn with the geometry it was calculated for
+    def __init__(self, fig, ax, geo, plo):
+        self.ax = ax
+        self.geo = geo
+        self.plo = plo
+        self.delay = plo.cont_async_delay/1e3
+        self.max_wait = plo.cont_async_max/1e3
+        self.cond = threading.Condition()
+        # job: (number, geometry, standard d-spacings, first event, last event)
+        self.job = None
+        self.gen = 0
+        self.busy = False
+        # result: (number, geometry, settings, contours, last event)
+        self.result = None
+        self.drawn = 0
+        self.timer = fig.canvas.new_timer(interval=10)
+        self.timer.add_callback(self.poll)
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, geo):
+        # called on the GUI thread
+        with self.cond:
+            self.gen += 1
+            _now = time.perf_counter()
+            _first = self.job[3] if self.job is not None else _now
+            self.job = (self.gen, copy.copy(geo), getattr(self.plo, 'cont_std_dsp', None), _first, _now)
+            self.cond.notify()
+        self.timer.start()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.job is None:
+                    self.cond.wait()
+                _gen, _geo, _dsp, _first, _last = self.job
+                # debounce the slider events
+                _now = time.perf_counter()
+                _wait = min(_last + self.delay, _first + self.max_wait) - _now
+                if _wait > 0:
+                    self.cond.wait(_wait)
+                    continue
+                _forced = _now - _last < self.delay
+                self.job = None
+                self.busy = True
+            _plo = copy.copy(self.plo)
+            _plo.cont_std_dsp = _dsp
+            if _forced:
+                ctr = get_contours(_geo, _plo)
+            else:
+                ctr = get_contours(_geo, _plo, cancel=lambda: self.gen != _gen)
+            with self.cond:
+                self.busy = False
+                if ctr is not None:
+                    self.result = (_gen, _geo, _plo, ctr, _last)
+
+    def poll(self):
+        # called by the timer on the GUI thread
+        with self.cond:
+            _res, self.result = self.result, None
+            _idle = self.job is None and not self.busy
+        if _res is not None and _res[0] > self.drawn:
+            _gen, _geo, _plo, ctr, _last = _res
+            self.drawn = _gen
+            if _plo.cont_perf is not None:
+                _plo.cont_perf.begin(_last)
+            draw_contours(self.ax, _geo, _plo, ctr)
+            show_contours(_geo, _plo)
+        if _idle:
+            self.timer.stop()
+
+class perf_stats(object):
+    ##################################################
+    # Timings of the contour stages per frame        #
+    ##################################################
+    # - a frame is one update_plot call (the first one
+    #   is the initial draw in make_plot)
+    # - stages [ms]: grid (grid construction), geo_cone,
+    #   trace (contour tracing), conic (conic sections),
+    #   labels (artists and label placement), draw (canvas)
+    # - draw is only the canvas time if the contours are
+    #   blitted, draw_idle returns before the canvas is drawn
+    # - grid_res: grid resolution of the drawn levels (grid),
+    #   points: (level index, points) of the drawn levels,
+    #   skipped: levels after the early break, cached: the
+    #   contours came from the cache
+    # - only exists if plo.cont_perf_stats/plo.cont_perf_overlay
+    #   are set, plo.cont_perf is None otherwise
+    def __init__(self, window):
+        self.frames = deque(maxlen=window)
+        self.last = None
+        self.count = 0
+        self.begin()
+
+    def begin(self, t0=None):
+        # t0: start of the frame, e.g. the slider event
+        self.cur = {'stages':{}, 'grid_res':[], 'points':[], 'levels':0, 'skipped':0, 'cached':False}
+        self.t0 = time.perf_counter() if t0 is None else t0
+
+    def add(self, stage, t0):
+        # add the time since t0 to a stage
+        _dt = (time.perf_counter() - t0)*1e3
+        self.cur['stages'][stage] = self.cur['stages'].get(stage, 0.0) + _dt
+
+    def end(self):
+        self.cur['total'] = (time.perf_counter() - self.t0)*1e3
+        self.frames.append(self.cur)
+        self.last = self.cur
+        self.count += 1
+        self.begin()
+
+    def stats(self):
+        # last frame and the averages of the rolling window
+        _n = len(self.frames)
+        _avg = {}
+        for _f in self.frames:
+            for _k, _v in _f['stages'].items():
+                _avg[_k] = _avg.get(_k, 0.0) + _v/_n
+        return {'frames':self.count, 'window':_n, 'last':self.last,
+                'avg_total':sum(_f['total'] for _f in self.frames)/_n if _n else 0.0,
+                'avg_stages':_avg,
+                'cached':sum(_f['cached'] for _f in self.frames)/_n if _n else 0.0}
+
+    def text(self):
+        if self.last is None:
+            return ''
+        _s = self.stats()
+        return f'frame {self.last["total"]:6.1f} ms | avg {_s["avg_total"]:6.1f} ms ({_s["window"]})\n'\
+             + ' '.join(f'{_k} {_v:.1f}' for _k, _v in self.last['stages'].items())
+
 if __name__ == '__main__':
-    main()
+    # Plot_det_geo.py                        -> interactive plot
+    # Plot_det_geo.py sweep.json [out] [fmt] -> headless sweep
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as _f:
+            _spec = json.load(_f)
+        _out = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(sys.argv[1])[0]
+        _fmt = sys.argv[3] if len(sys.argv) > 3 else 'png'
+        if os.path.splitext(_out)[1].lower() in ['.mp4', '.gif']:
+            render_movie(_spec, _out, workers=int(os.environ.get('DET_GEO_WORKERS', 0)) or None)
+        else:
+            render_sweep(_spec, _out, _fmt, int(os.environ.get('DET_GEO_WORKERS', 0)) or None)
+    else:
+        main()